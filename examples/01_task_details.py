@@ -47,6 +47,7 @@ if __name__ == '__main__':
         # read the config used for resource details
         report.info('read config')
         config = ru.read_json('%s/config.json' % os.path.dirname(__file__))
+        rcfg   = config[resource]
         report.ok('>>ok\n')
 
         report.header('submit pilots')
@@ -60,11 +61,11 @@ if __name__ == '__main__':
         pd_init = {'resource'      : resource,
                    'runtime'       : 300,
                    'exit_on_error' : True,
-                   'project'       : config[resource].get('project', None),
-                   'queue'         : config[resource].get('queue', None),
-                   'access_schema' : config[resource].get('schema', None),
+                   'project'       : rcfg.get('project', None),
+                   'queue'         : rcfg.get('queue', None),
+                   'access_schema' : rcfg.get('schema', None),
                    'cores'         : 1024 * 16,
-                   'gpus'          : config[resource].get('gpus', 0),
+                   'gpus'          : rcfg.get('gpus', 0),
                    }
         pdesc = rp.PilotDescription(pd_init)
 
@@ -78,27 +79,24 @@ if __name__ == '__main__':
 
         # Create a workload of tasks.
         # Each task runs '/bin/date'.
-        n = 1 * 1024  # number of tasks to run
+        n    = 1 * 1024  # number of tasks to run
+        bulk = 256        # number of tasks to submit per call
         report.info('create %d task description(s)\n' % n)
 
-        tds = list()
-        report.progress_tgt(n, label='create')
-        for i in range(0, n):
-
-            # create a new task description, and fill it.
-            # Here we don't use dict initialization.
-            td = rp.TaskDescription()
-            td.executable = '/bin/date'
-            td.sandbox    = 'task_sandbox'
-            tds.append(td)
-            report.progress()
-
-        report.progress_done()
-
-        # Submit the previously created task descriptions to the
-        # PilotManager. This will trigger the selected scheduler to start
-        # assigning tasks to the pilots.
-        tasks = tmgr.submit_tasks(tds)
+        # All tasks are identical, so we create a single task description and
+        # submit it `n` times: each task keeps its own copy of the description.
+        # Here we use dict initialization, so that the description is
+        # validated once, not on every attribute assignment.
+        td = rp.TaskDescription({'executable': '/bin/date',
+                                 'sandbox'   : 'task_sandbox'})
+
+        # Submit the task description to the TaskManager, in bulks of `bulk`
+        # tasks, so that only one bulk of descriptions is held at any time.
+        # This will trigger the selected scheduler to start assigning tasks to
+        # the pilots.
+        tasks = list()
+        for i in range(0, n, bulk):
+            tasks += tmgr.submit_tasks([td] * min(bulk, n - i))
 
         # Wait for all tasks to reach a final state (DONE, CANCELED or FAILED).
         report.header('gather results')
@@ -111,11 +109,11 @@ if __name__ == '__main__':
                         task.exit_code, task.stdout))
 
         # get some more details for one task:
-        task_dict = tasks[0].as_dict()
-        report.plain("task workdir : %s\n" % task_dict['task_sandbox'])
-        report.plain("pilot id     : %s\n" % task_dict['pilot'])
-        report.plain("exit code    : %s\n" % task_dict['exit_code'])
-        report.plain("stdout       : %s\n" % task_dict['stdout'])
+        task = tasks[0]
+        report.plain("task workdir : %s\n" % task.task_sandbox)
+        report.plain("pilot id     : %s\n" % task.pilot)
+        report.plain("exit code    : %s\n" % task.exit_code)
+        report.plain("stdout       : %s\n" % task.stdout)
 
 
     except Exception as e:
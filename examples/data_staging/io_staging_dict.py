@@ -18,7 +18,7 @@ import radical.pilot as rp
 def pilot_state_cb (pilot, state):
     """ this callback is invoked on all pilot state changes """
 
-    print("[Callback]: Pilot '%s' state: %s." % (pilot.uid, state))
+    print(f"[Callback]: Pilot '{pilot.uid}' state: {state}.")
 
     if state == rp.FAILED:
         sys.exit (1)
@@ -29,7 +29,7 @@ def pilot_state_cb (pilot, state):
 def task_state_cb (task, state):
     """ this callback is invoked on all task state changes """
 
-    print("[Callback]: Task '%s' state: %s." % (task.uid, state))
+    print(f"[Callback]: Task '{task.uid}' state: {state}.")
 
     if state == rp.FAILED:
         sys.exit (1)
@@ -48,7 +48,7 @@ if __name__ == "__main__":
     # Create a new session. No need to try/except this: if session creation
     # fails, there is not much we can do anyways...
     session = rp.Session(uid=session_name)
-    print("session id: %s" % session.uid)
+    print(f"session id: {session.uid}")
 
     # all other pilot code is now tried/excepted.  If an exception is caught, we
     # can rely on the session object to exist and be valid, and we can thus tear
@@ -117,12 +117,12 @@ if __name__ == "__main__":
         # Wait for the task to reach a terminal state (DONE or FAILED).
         tmgr.wait_tasks()
 
-        print("* Task %s state: %s, exit code: %s" %
-              (task.uid, task.state, task.exit_code))
+        print(f"* Task {task.uid} state: {task.state}, "
+              f"exit code: {task.exit_code}")
 
     except Exception as e:
         # Something unexpected happened in the pilot code above
-        print("caught Exception: %s" % e)
+        print(f"caught Exception: {e}")
         raise
 
     except (KeyboardInterrupt, SystemExit) as e:
@@ -130,7 +130,7 @@ if __name__ == "__main__":
         # corresponding KeyboardInterrupt exception for shutdown.  We also catch
         # SystemExit (which gets raised if the main threads exits for some other
         # reason).
-        print("need to exit now: %s" % e)
+        print(f"need to exit now: {e}")
 
     finally:
         # always clean up the session, no matter if we caught an exception or
@@ -2,9 +2,9 @@
 
 import os
 import sys
-import time
+import array
 
-from collections import defaultdict
+from operator import itemgetter
 
 import radical.utils as ru
 import radical.pilot as rp
@@ -31,10 +31,35 @@ def out(msg):
 
 RANKS = 2
 
+# index of each task mode in the submitted / collected task counters - any
+# other (new or custom) mode is counted in the last slot
+MODE_IDX = {rp.TASK_EXECUTABLE: 0,
+            rp.TASK_FUNCTION  : 1,
+            rp.TASK_METHOD    : 2,
+            rp.TASK_EVAL      : 3,
+            rp.TASK_EXEC      : 4,
+            rp.TASK_PROC      : 5,
+            rp.TASK_SHELL     : 6}
+OTHER_IDX = len(MODE_IDX)
 
+_get_descr = itemgetter('description')
+_get_mode  = itemgetter('mode')
+
+
+def count_modes(counter, tasks):
+    '''
+    increment the per-mode `counter` for all given tasks
+    '''
+    for mode in map(_get_mode, map(_get_descr, tasks)):
+        counter[MODE_IDX.get(mode, OTHER_IDX)] += 1
+
+
+# NOTE: `pythontask` functions are serialized by value and executed in the
+#       worker's namespace, which does not contain this module's imports.
+#       The imports thus need to live in the function bodies (repeated imports
+#       are resolved from `sys.modules` and are cheap).
 @rp.pythontask
 def func_mpi(comm, msg, sleep):
-    # pylint: disable=reimported
     import time
     print('hello %d/%d: %s' % (comm.rank, comm.size, msg))
     time.sleep(sleep)
@@ -43,7 +68,6 @@ def func_mpi(comm, msg, sleep):
 
 @rp.pythontask
 def func_non_mpi(a, sleep):
-    # pylint: disable=reimported
     import math
     import random
     import time
@@ -68,14 +92,18 @@ class MyMaster(rp.raptor.Master):
     def __init__(self, cfg: ru.Config):
 
         self._cnt = 0
-        self._submitted = defaultdict(int)
-        self._collected = defaultdict(int)
+        self._submitted = array.array('q', [0] * (OTHER_IDX + 1))
+        self._collected = array.array('q', [0] * (OTHER_IDX + 1))
 
         # initialize the task overlay base class.  That base class will ensure
         # proper communication channels to the pilot agent.
         super().__init__(cfg=cfg)
         self._sleep = cfg.sleep
 
+        # command for the extra `proc` tasks submitted from `request_cb`
+        self._extra_cmd = 'sleep %d; ' % self._sleep + \
+                          'echo "hello $RP_RANK/$RP_RANKS: $RP_TASK_ID"'
+
 
     # --------------------------------------------------------------------------
     #
@@ -176,8 +204,8 @@ class MyMaster(rp.raptor.Master):
         # wait for outstanding tasks to complete
         while not self._term.is_set():
 
-            completed = sum(self._collected.values())
-            submitted = sum(self._submitted.values())
+            completed = sum(self._collected)
+            submitted = sum(self._submitted)
 
             if submitted:
                 # request_cb has been called, so we can wait for completion
@@ -187,7 +215,7 @@ class MyMaster(rp.raptor.Master):
                 if completed >= submitted:
                     break
 
-            time.sleep(1)
+            self._term.wait(timeout=1)
 
         self._log.info('submit done!')
 
@@ -196,27 +224,23 @@ class MyMaster(rp.raptor.Master):
     #
     def request_cb(self, tasks):
 
+        count_modes(self._submitted, tasks)
+
         for task in tasks:
 
             self._log.debug('request_cb %s\n', task['uid'])
 
-            mode = task['description']['mode']
-            uid  = task['description']['uid']
-
-            self._submitted[mode] += 1
+            descr = task['description']
 
             # for each `function` mode task, submit one more `proc` mode request
-            if mode == rp.TASK_FUNC:
+            if descr['mode'] == rp.TASK_FUNC:
                 self.submit_tasks(rp.TaskDescription(
-                    {'uid'       : 'extra' + uid,
+                    {'uid'       : 'extra' + descr['uid'],
                    # 'timeout'   : 10,
                      'mode'      : rp.TASK_PROC,
                      'ranks'     : RANKS,
                      'executable': '/bin/sh',
-                     'arguments' : ['-c',
-                                    'sleep %d; ' % self._sleep +
-                                    'echo "hello $RP_RANK/$RP_RANKS: '
-                                          '$RP_TASK_ID"'],
+                     'arguments' : ['-c', self._extra_cmd],
                      'raptor_id' : 'master.000000'}))
 
         return tasks
@@ -230,22 +254,21 @@ class MyMaster(rp.raptor.Master):
 
         Log file is named by the master tasks UID.
         '''
+        count_modes(self._collected, tasks)
+
         for task in tasks:
 
-            mode = task['description']['mode']
-            self._collected[mode] += 1
+            uid   = task['uid']
+            state = task['state']
+            sout  = task['stdout']
+            ret   = task['return_value']
 
             # NOTE: `state` will be `AGENT_EXECUTING`
-            self._log.info('result_cb  %s: %s [%s] [%s]',
-                            task['uid'],
-                            task['state'],
-                            task['stdout'],
-                            task['return_value'])
+            self._log.info('result_cb  %s: %s [%s] [%s]', uid, state, sout, ret)
 
             # Note that stdout is part of the master task result.
             print('id: %s [%s]:\n    out: %s\n    ret: %s\n'
-                 % (task['uid'], task['state'], task['stdout'],
-                    task['return_value']))
+                 % (uid, state, sout, ret))
 
 
     # --------------------------------------------------------------------------
@@ -306,7 +329,8 @@ if __name__ == '__main__':
     master.stop()
 
     # TODO: worker state callback
-    master.join()
+    while not master.join(timeout=5.0):
+        out('waiting for master to finish')
 
     # TODO: expose RPC hooks
 
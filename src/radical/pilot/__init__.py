@@ -8,6 +8,9 @@ __license__   = "MIT"
 # module, and also to monkeypatch `os.fork()` for the `atfork` functionality
 import radical.utils as _ru
 
+import os        as _os
+import importlib as _importlib
+
 # ------------------------------------------------------------------------------
 # constants and types
 from .states     import *
@@ -15,54 +18,101 @@ from .constants  import *
 
 
 # ------------------------------------------------------------------------------
-# import API
-from .session                   import Session
-from .proxy                     import Proxy
-
-from .task_manager              import TaskManager
-from .task                      import Task
-from .raptor_tasks              import RaptorMaster, RaptorWorker
-from .pytask                    import PythonTask
-from .task_description          import TaskDescription
-from .task_description          import TASK_EXECUTABLE
-from .task_description          import TASK_METH, TASK_METHOD
-from .task_description          import TASK_FUNC, TASK_FUNCTION
-from .task_description          import TASK_EXEC, TASK_EVAL
-from .task_description          import TASK_PROC, TASK_SHELL
-from .task_description          import RAPTOR_MASTER, RAPTOR_WORKER
-from .task_description          import AGENT_SERVICE
-from .resource_config           import ResourceConfig
-
-from .pilot_manager             import PilotManager
-from .pilot                     import Pilot
-from .pilot_description         import PilotDescription
-
-pythontask = PythonTask.pythontask
+# import API -- the API classes and submodules are only imported when first
+# accessed (PEP 562), so that client code does not pay for loading the agent,
+# raptor and component machinery it never uses.  The table maps the exported
+# name to its defining module and attribute (`None` for submodules).
+_LAZY = {
+    'Session'         : ('.session',          'Session'),
+    'Proxy'           : ('.proxy',            'Proxy'),
+
+    'TaskManager'     : ('.task_manager',     'TaskManager'),
+    'Task'            : ('.task',             'Task'),
+    'RaptorMaster'    : ('.raptor_tasks',     'RaptorMaster'),
+    'RaptorWorker'    : ('.raptor_tasks',     'RaptorWorker'),
+    'PythonTask'      : ('.pytask',           'PythonTask'),
+    'TaskDescription' : ('.task_description', 'TaskDescription'),
+    'TASK_EXECUTABLE' : ('.task_description', 'TASK_EXECUTABLE'),
+    'TASK_METH'       : ('.task_description', 'TASK_METH'),
+    'TASK_METHOD'     : ('.task_description', 'TASK_METHOD'),
+    'TASK_FUNC'       : ('.task_description', 'TASK_FUNC'),
+    'TASK_FUNCTION'   : ('.task_description', 'TASK_FUNCTION'),
+    'TASK_EXEC'       : ('.task_description', 'TASK_EXEC'),
+    'TASK_EVAL'       : ('.task_description', 'TASK_EVAL'),
+    'TASK_PROC'       : ('.task_description', 'TASK_PROC'),
+    'TASK_SHELL'      : ('.task_description', 'TASK_SHELL'),
+    'RAPTOR_MASTER'   : ('.task_description', 'RAPTOR_MASTER'),
+    'RAPTOR_WORKER'   : ('.task_description', 'RAPTOR_WORKER'),
+    'AGENT_SERVICE'   : ('.task_description', 'AGENT_SERVICE'),
+    'ResourceConfig'  : ('.resource_config',  'ResourceConfig'),
+
+    'PilotManager'    : ('.pilot_manager',    'PilotManager'),
+    'Pilot'           : ('.pilot',            'Pilot'),
+    'PilotDescription': ('.pilot_description', 'PilotDescription'),
+
+    # make submodules available -- mostly for internal use
+    'utils'           : ('.utils',            None),
+    'tmgr'            : ('.tmgr',             None),
+    'pmgr'            : ('.pmgr',             None),
+    'agent'           : ('.agent',            None),
+    'raptor'          : ('.raptor',           None),
+
+    'Agent_0'         : ('.agent',            'Agent_0'),
+    'Agent_n'         : ('.agent',            'Agent_n'),
+
+    'Master'          : ('.raptor',           'Master'),
+    'Worker'          : ('.raptor',           'Worker'),
+}
 
 
 # ------------------------------------------------------------------------------
-# make submodules available -- mostly for internal use
-from . import utils
-from . import tmgr
-from . import pmgr
-from . import agent
+#
+# version info -- this is deferred until any of the version attributes is first
+# accessed, so that a plain `import radical.pilot` does not need to search for
+# and parse the version files.
+#
+_VERSION_ATTRS = ['version_short', 'version_detail', 'version_base',
+                  'version_branch', 'sdist_name', 'sdist_path']
+
+
+# ------------------------------------------------------------------------------
+#
+def __getattr__(name):
+
+    if name in _LAZY:
+
+        mod_name, attr = _LAZY[name]
+        mod = _importlib.import_module(mod_name, __name__)
+        obj = mod if attr is None else getattr(mod, attr)
 
-from .agent  import Agent_0
-from .agent  import Agent_n
+        globals()[name] = obj
+        return obj
 
-from .raptor import Master, Worker
+    if name == 'pythontask':
+
+        obj = __getattr__('PythonTask').pythontask
+
+        globals()[name] = obj
+        return obj
+
+    if name == 'version' or name in _VERSION_ATTRS:
+
+        info = _ru.get_version(_os.path.dirname(__file__))
+
+        globals().update(zip(_VERSION_ATTRS, info))
+        globals()['version'] = globals()['version_short']
+
+        return globals()[name]
+
+    raise AttributeError("module '%s' has no attribute '%s'" % (__name__, name))
 
 
 # ------------------------------------------------------------------------------
 #
-# get version info
-#
-import os as _os
-
-version_short, version_detail, version_base, version_branch, \
-        sdist_name, sdist_path = _ru.get_version(_os.path.dirname(__file__))
+def __dir__():
 
-version = version_short
+    return sorted(list(globals()) + list(_LAZY) + ['pythontask', 'version']
+                  + _VERSION_ATTRS)
 
 
 # ------------------------------------------------------------------------------
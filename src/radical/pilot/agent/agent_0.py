@@ -2,11 +2,8 @@
 __copyright__ = 'Copyright 2014-2022, The RADICAL-Cybertools Team'
 __license__   = 'MIT'
 
-import copy
 import os
-import stat
 import time
-import pprint
 
 import threading           as mt
 
@@ -54,6 +51,12 @@ class Agent_0(rpu.AgentComponent):
         self._starttime   = time.time()
         self._final_cause = None
 
+        # the runtime limit (if any) does not change, use an absolute deadline
+        self._deadline = None
+        if self._session.cfg.runtime:
+            self._deadline = self._starttime \
+                           + int(self._session.cfg.runtime) * 60
+
         # keep some state about service startups
         self._service_uids_launched = list()
         self._service_uids_running  = list()
@@ -65,11 +68,17 @@ class Agent_0(rpu.AgentComponent):
         # ensure that app communication channels are visible to workload
         self._configure_app_comm()
 
+        # env settings to be passed to all tasks (if any)
+        self._task_env = None
+        if 'task_environment' in self.session.rcfg:
+            self._task_env = dict(self.session.rcfg.task_environment)
+
         # start the sub agents
         self._start_sub_agents()
 
         # regularly check for lifetime limit
-        self.register_timed_cb(self._check_lifetime, timer=10)
+        if self._deadline:
+            self.register_timed_cb(self._check_lifetime, timer=10)
 
 
     # --------------------------------------------------------------------------
@@ -80,24 +89,27 @@ class Agent_0(rpu.AgentComponent):
 
         to_advance = list()
 
-        for task in msg:
-
-            # make sure the tasks obtain env settings (if needed)
-            if 'task_environment' in self.session.rcfg:
-
-                if not task['description'].get('environment'):
-                    task['description']['environment'] = dict()
+        task_env = self._task_env
+        pending  = rps.AGENT_STAGING_INPUT_PENDING
 
-                for k,v in self.session.rcfg.task_environment.items():
-                    # FIXME: this might overwrite user specified env
-                    task['description']['environment'][k] = v
+        for task in msg:
 
             # FIXME: raise or fail task!
-            if task['state'] != rps.AGENT_STAGING_INPUT_PENDING:
+            if task['state'] != pending:
                 self._log.error('invalid state: %s:%s:%s', task['uid'],
                         task['state'], task.get('states'))
                 continue
 
+            # make sure the tasks obtain env settings (if needed)
+            if task_env is not None:
+
+                descr = task['description']
+                if not descr.get('environment'):
+                    descr['environment'] = dict()
+
+                # FIXME: this might overwrite user specified env
+                descr['environment'].update(task_env)
+
             to_advance.append(task)
 
         # now we really own the tasks and can start working on them (ie. push
@@ -220,7 +232,7 @@ class Agent_0(rpu.AgentComponent):
     def work(self):
 
         # all work is done in the registered callbacks
-        time.sleep(1)
+        self._term.wait(timeout=1)
 
 
     # --------------------------------------------------------------------------
@@ -231,8 +243,10 @@ class Agent_0(rpu.AgentComponent):
 
             if not os.path.isfile('./staging_output.tgz'):
 
-                cmd = 'tar zcvf staging_output.tgz $(cat staging_output.txt)'
-                out, err, ret = ru.sh_callout(cmd, shell=True)
+                # read the file list directly, to avoid a subshell and to not
+                # run into command line length limits for large lists
+                cmd = 'tar -czf staging_output.tgz -T staging_output.txt'
+                out, err, ret = ru.sh_callout(cmd)
 
                 if ret:
                     self._log.debug('out: %s', out)
@@ -250,14 +264,9 @@ class Agent_0(rpu.AgentComponent):
 
         self._log.info('rusage: %s', rpu.get_rusage())
 
-        out, err, log = '', '', ''
-
-        try   : out = open('./agent_0.out', 'r').read(1024)
-        except: pass
-        try   : err = open('./agent_0.err', 'r').read(1024)
-        except: pass
-        try   : log = open('./agent_0.log', 'r').read(1024)
-        except: pass
+        out = self._read_file('./agent_0.out')
+        err = self._read_file('./agent_0.err')
+        log = self._read_file('./agent_0.log')
 
         if   self._final_cause == 'timeout'  : state = rps.DONE
         elif self._final_cause == 'cancel'   : state = rps.CANCELED
@@ -285,6 +294,24 @@ class Agent_0(rpu.AgentComponent):
         self._session.close()
 
 
+    # --------------------------------------------------------------------------
+    #
+    def _read_file(self, fname, size=1024):
+        '''
+        return (up to) the last `size` bytes of the given file, or an empty
+        string if the file cannot be read
+        '''
+
+        try:
+            with open(fname, 'rb') as fin:
+                fsize = os.fstat(fin.fileno()).st_size
+                if fsize > size:
+                    fin.seek(fsize - size)
+                return fin.read(size).decode('utf-8', errors='replace')
+        except OSError:
+            return ''
+
+
     # --------------------------------------------------------------------------
     #
     def _start_services(self):
@@ -433,6 +460,10 @@ class Agent_0(rpu.AgentComponent):
 
         bs_name = '%s/bootstrap_2.sh'
 
+        # all sub-agent tasks have the same shape, so we only need to find
+        # a suitable launcher once and can reuse it for all sub-agents
+        launcher = None
+
         for idx, sa in enumerate(self.session.cfg['agents']):
 
             target  = self.session.cfg['agents'][sa]['target']
@@ -487,33 +518,32 @@ class Agent_0(rpu.AgentComponent):
                 }
 
                 # find a launcher to use
-                launcher = self._rm.find_launcher(agent_task)
                 if not launcher:
-                    raise RuntimeError('no launch method found for sub agent')
+                    launcher = self._rm.find_launcher(agent_task)
+                    if not launcher:
+                        raise RuntimeError('no launch method found for '
+                                           'sub agent')
 
                 # FIXME: set RP environment (as in Popen Executor)
 
-                tmp  = '#!/bin/sh\n\n'
-                tmp += 'export RP_PILOT_SANDBOX="%s"\n\n' % self._pwd
-                cmds = launcher.get_launcher_env()
-                for cmd in cmds:
-                    tmp += '%s || exit 1\n' % cmd
+                env_cmds  = launcher.get_launcher_env()
+                exec_cmds = launcher.get_launch_cmds(agent_task, exec_script)
 
-                cmds = launcher.get_launch_cmds(agent_task, exec_script)
-                tmp += '%s\nexit $?\n\n' % cmds
+                tmp = ''.join(['#!/bin/sh\n\n',
+                               'export RP_PILOT_SANDBOX="%s"\n\n' % self._pwd]
+                              + ['%s || exit 1\n' % cmd for cmd in env_cmds]
+                              + ['%s\nexit $?\n\n' % exec_cmds])
                 with ru.ru_open(launch_script, 'w') as fout:
                     fout.write(tmp)
 
-                tmp  = '#!/bin/sh\n\n'
-                tmp += '/bin/sh -l %s\n\n' % ' '.join([bs_name % '.'] + bs_args)
+                tmp = '#!/bin/sh\n\n/bin/sh -l %s\n\n' \
+                    % ' '.join([bs_name % '.'] + bs_args)
                 with ru.ru_open(exec_script, 'w') as fout:
                     fout.write(tmp)
 
                 # make sure scripts are executable
-                st_l = os.stat(launch_script)
-                st_e = os.stat(exec_script)
-                os.chmod(launch_script, st_l.st_mode | stat.S_IEXEC)
-                os.chmod(exec_script,   st_e.st_mode | stat.S_IEXEC)
+                os.chmod(launch_script, 0o755)
+                os.chmod(exec_script,   0o755)
 
                 # spawn the sub-agent
                 cmdline = launch_script
@@ -531,16 +561,13 @@ class Agent_0(rpu.AgentComponent):
     def _check_lifetime(self):
 
         # Make sure that we haven't exceeded the runtime - otherwise terminate.
-        if self.session.cfg.runtime:
+        if self._deadline and time.time() >= self._deadline:
 
-            if time.time() >= self._starttime + \
-                                           (int(self.session.cfg.runtime) * 60):
-
-                self._log.info('runtime limit (%ss).',
-                               self.session.cfg.runtime * 60)
-                self._final_cause = 'timeout'
-                self.stop()
-                return False  # we are done
+            self._log.info('runtime limit (%ss).',
+                           self._deadline - self._starttime)
+            self._final_cause = 'timeout'
+            self.stop()
+            return False  # we are done
 
         return True
 
@@ -578,8 +605,10 @@ class Agent_0(rpu.AgentComponent):
 
         arg = msg['arg']
 
-        if self._pid not in arg.get('uids'):
+        # the command is broadcast: leave it alone unless it targets us
+        if self._pid not in arg.get('uids', []):
             self._log.debug('ignore cancel %s', msg)
+            return True
 
         self._log.info('cancel pilot cmd')
         self.publish(rpc.CONTROL_PUBSUB, {'cmd' : 'terminate',
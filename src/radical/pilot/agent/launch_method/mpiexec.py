@@ -2,6 +2,8 @@
 __copyright__ = 'Copyright 2016-2023, The RADICAL-Cybertools Team'
 __license__   = 'MIT'
 
+import re
+
 from collections import defaultdict
 
 import radical.utils as ru
@@ -48,6 +50,7 @@ class MPIExec(LaunchMethod):
             'mpt'    : False,
             'rsh'    : False,
             'use_rf' : False,
+            'use_hf' : False,
             'ccmrun' : '',
             'dplace' : '',
             'omplace': ''
@@ -76,15 +79,16 @@ class MPIExec(LaunchMethod):
             lm_info['omplace'] = 'omplace'
             lm_info['mpt']     = True
 
+        # the help text is the same for all option checks - fetch it only once
+        lm_help = ru.sh_callout('%s --help' % lm_info['command'])[0]
+
         # check that this implementation allows to use `rankfile` option
-        lm_info['use_rf'] = self._check_available_lm_options(
-            lm_info['command'], '-rf')
+        lm_info['use_rf'] = self._check_available_lm_options(lm_help, '-rf')
 
         # if we fail, then check if this implementation allows to use
         # `host names` option
         if not lm_info['use_rf']:
-            lm_info['use_hf'] = self._check_available_lm_options(
-                lm_info['command'], '-f')
+            lm_info['use_hf'] = self._check_available_lm_options(lm_help, '-f')
 
         mpi_version, mpi_flavor = self._get_mpi_info(lm_info['command'])
         lm_info['mpi_version']  = mpi_version
@@ -94,11 +98,11 @@ class MPIExec(LaunchMethod):
 
     # --------------------------------------------------------------------------
     #
-    def _check_available_lm_options(self, lm_cmd, option):
-        check = bool(ru.sh_callout('%s --help | grep -e "%s\\>"' %
-                                  (lm_cmd, option), shell=True)[0])
+    @staticmethod
+    def _check_available_lm_options(lm_help, option):
 
-        return check
+        # same as `grep -e "<option>\\>"` on the launcher's help text
+        return bool(re.search(r'%s\b' % re.escape(option), lm_help or ''))
 
     # --------------------------------------------------------------------------
     #
@@ -126,6 +130,9 @@ class MPIExec(LaunchMethod):
         else:
             self._omplace = 'omplace'
 
+        # the rank detection only depends on the MPI flavor - build it once
+        self._rank_cmd = self._build_rank_cmd()
+
 
     # --------------------------------------------------------------------------
     #
@@ -158,6 +165,21 @@ class MPIExec(LaunchMethod):
         return lm_env_cmds
 
 
+    # --------------------------------------------------------------------------
+    #
+    @staticmethod
+    def _get_host_slots(slots):
+        '''
+        map node names to the number of ranks placed on them, in order of their
+        first occurrence in the slots
+        '''
+        host_slots = defaultdict(int)
+        for rank in slots['ranks']:
+            host_slots[rank['node_name']] += len(rank['core_map'])
+
+        return host_slots
+
+
     # --------------------------------------------------------------------------
     #
     @staticmethod
@@ -167,18 +189,20 @@ class MPIExec(LaunchMethod):
             rank 0=localhost slots=0,1,2,3
             rank 1=localhost slots=4,5,6,7
         '''
-        rf_str  = ''
-        rank_id = 0
+        rf_lines = list()
+        rank_id  = 0
 
         for rank in slots['ranks']:
+            node_name = rank['node_name']
             for core_map in rank['core_map']:
-                rf_str += ('rank %d=%s ' % (rank_id, rank['node_name']) +
-                           'slots=%s\n' % ','.join([str(c) for c in core_map]))
+                rf_lines.append('rank %d=%s slots=%s\n'
+                                % (rank_id, node_name,
+                                   ','.join([str(c) for c in core_map])))
                 rank_id += 1
 
         rf_name = '%s/%s.rf' % (sandbox, uid)
         with ru.ru_open(rf_name, 'w') as fout:
-            fout.write(rf_str)
+            fout.write(''.join(rf_lines))
 
         return rf_name
 
@@ -186,7 +210,8 @@ class MPIExec(LaunchMethod):
     # --------------------------------------------------------------------------
     #
     @staticmethod
-    def _get_host_file(slots, uid, sandbox, simple=True, mode=0):
+    def _get_host_file(slots, uid, sandbox, simple=True, mode=0,
+                       host_slots=None):
         '''
         Host file (simple=True):
             localhost
@@ -194,18 +219,18 @@ class MPIExec(LaunchMethod):
             localhost slots=2
         Host file (simple=False, mode=1):
             localhost:2
+
+        `host_slots` can be passed if already obtained via `_get_host_slots`.
         '''
-        host_slots = defaultdict(int)
-        for rank in slots['ranks']:
-            host_slots[rank['node_name']] += len(rank['core_map'])
+        if host_slots is None:
+            host_slots = MPIExec._get_host_slots(slots)
 
         if simple:
-            hf_str = '%s\n' % '\n'.join(list(host_slots.keys()))
+            hf_str = '%s\n' % '\n'.join(host_slots.keys())
         else:
-            hf_str    = ''
             slots_ref = ':' if mode else ' slots='
-            for host_name, num_slots in host_slots.items():
-                hf_str += '%s%s%d\n' % (host_name, slots_ref, num_slots)
+            hf_str    = ''.join(['%s%s%d\n' % (host_name, slots_ref, num_slots)
+                                 for host_name, num_slots in host_slots.items()])
 
         hf_name = '%s/%s.hf' % (sandbox, uid)
         with ru.ru_open(hf_name, 'w') as fout:
@@ -224,23 +249,20 @@ class MPIExec(LaunchMethod):
 
         assert slots.get('ranks'), 'task.slots.ranks not defined'
 
-        host_slots = defaultdict(int)
-        for rank in slots['ranks']:
-            host_slots[rank['node_name']] += len(rank['core_map'])
-
+        # walk the ranks only once for rank count and host list
+        host_slots  = self._get_host_slots(slots)
         cmd_options = '-np %d ' % sum(host_slots.values())
 
         if self._use_rf:
             rankfile     = self._get_rank_file(slots, uid, sbox)
-            hosts        = set([r['node_name'] for r in slots['ranks']])
-            cmd_options += '-H %s -rf %s' % (','.join(hosts), rankfile)
+            cmd_options += '-H %s -rf %s' % (','.join(host_slots), rankfile)
 
         elif self._mpi_flavor == self.MPI_FLAVOR_PALS:
-            hostfile     = self._get_host_file(slots, uid, sbox)
+            hostfile     = self._get_host_file(slots, uid, sbox,
+                                               host_slots=host_slots)
             core_ids     = ':'.join([
                 str(cores[0]) + ('-%s' % cores[-1] if len(cores) > 1 else '')
-                for core_map in [rank['core_map'] for rank in slots['ranks']]
-                for cores in core_map])
+                for rank in slots['ranks'] for cores in rank['core_map']])
             cmd_options += '--ppn %d '           % max(host_slots.values()) + \
                            '--cpu-bind list:%s ' % core_ids + \
                            '--hostfile %s'       % hostfile
@@ -258,11 +280,12 @@ class MPIExec(LaunchMethod):
             #    cmd_options   += '--depth=%d --cpu-bind depth' % cores_per_rank
 
         elif self._use_hf:
-            hostfile = self._get_host_file(slots, uid, sbox, simple=False,
-                                           mode=1)
+            hostfile     = self._get_host_file(slots, uid, sbox, simple=False,
+                                               mode=1, host_slots=host_slots)
             cmd_options += '-f %s' % hostfile
         else:
-            hostfile     = self._get_host_file(slots, uid, sbox, simple=False)
+            hostfile     = self._get_host_file(slots, uid, sbox, simple=False,
+                                               host_slots=host_slots)
             cmd_options += '--hostfile %s' % hostfile
 
         if self._omplace:
@@ -274,7 +297,7 @@ class MPIExec(LaunchMethod):
 
     # --------------------------------------------------------------------------
     #
-    def get_rank_cmd(self):
+    def _build_rank_cmd(self):
 
         # FIXME: we know the MPI flavor, so make this less guesswork
 
@@ -293,5 +316,12 @@ class MPIExec(LaunchMethod):
         return ret
 
 
+    # --------------------------------------------------------------------------
+    #
+    def get_rank_cmd(self):
+
+        return self._rank_cmd
+
+
 # ------------------------------------------------------------------------------
 
@@ -5,7 +5,8 @@ __license__   = "MIT"
 import errno
 import os
 import shutil
-import tarfile
+
+import concurrent.futures as cf
 
 import radical.utils as ru
 
@@ -18,6 +19,11 @@ from .base import AgentStagingInputComponent
 from ...staging_directives import complete_url
 
 
+# staging ops of different tasks are independent and mostly I/O bound, so we
+# run them concurrently in a small thread pool.  The pool size can be
+# overwritten by the component config setting `staging_threads`.
+STAGING_THREADS = 8
+
 # ------------------------------------------------------------------------------
 #
 class Default(AgentStagingInputComponent):
@@ -42,6 +48,12 @@ class Default(AgentStagingInputComponent):
 
         self._pwd = os.getcwd()
 
+        # translated sandbox contexts, keyed by the (pilot level) sandbox URLs
+        self._contexts = dict()
+
+        n_threads  = self.cfg.get('staging_threads', STAGING_THREADS)
+        self._pool = cf.ThreadPoolExecutor(max_workers=n_threads)
+
         self.register_input(rps.AGENT_STAGING_INPUT_PENDING,
                             rpc.AGENT_STAGING_INPUT_QUEUE, self.work)
 
@@ -79,9 +91,16 @@ class Default(AgentStagingInputComponent):
             self.advance(no_staging_tasks, rps.AGENT_SCHEDULING_PENDING,
                          publish=True, push=True)
 
-        for task, actionables in staging_tasks:
+        # perform the staging in the thread pool, but advance the tasks in
+        # this thread once their staging completed (in any order)
+        futures = {self._pool.submit(self._handle_task, task, actionables): task
+                   for task, actionables in staging_tasks}
+
+        for future in cf.as_completed(futures):
+
+            task = futures[future]
             try:
-                self._handle_task(task, actionables)
+                future.result()
 
             except Exception as e:
                 self._log.exception('staging error')
@@ -92,6 +111,33 @@ class Default(AgentStagingInputComponent):
                 self.advance(task, rps.TMGR_STAGING_OUTPUT_PENDING,
                                    publish=True, push=True)
 
+            else:
+                # all staging is done -- pass on to the scheduler
+                self.advance(task, rps.AGENT_SCHEDULING_PENDING,
+                                   publish=True, push=True)
+
+
+    # --------------------------------------------------------------------------
+    #
+    def finalize(self):
+
+        self._pool.shutdown(wait=True)
+
+
+    # --------------------------------------------------------------------------
+    #
+    @staticmethod
+    def _localize(url):
+        '''
+        translate a sandbox URL into the `file://localhost` scope
+        '''
+
+        url        = ru.Url(url)
+        url.schema = 'file'
+        url.host   = 'localhost'
+
+        return url
+
 
     # --------------------------------------------------------------------------
     #
@@ -108,39 +154,31 @@ class Default(AgentStagingInputComponent):
         #   * paths are directly translatable across schemas
         #   * resource level storage is in fact accessible via file://
         #
-        # FIXME: URL creation and manipulation is costly and should be cached
-
-        task_sandbox     = ru.Url(task['task_sandbox'])
-        pilot_sandbox    = ru.Url(task['pilot_sandbox'])
-        session_sandbox  = ru.Url(task['session_sandbox'])
-        resource_sandbox = ru.Url(task['resource_sandbox'])
-        endpoint_fs      = ru.Url(task['endpoint_fs'])
-
-        task_sandbox.schema     = 'file'
-        pilot_sandbox.schema    = 'file'
-        session_sandbox.schema  = 'file'
-        resource_sandbox.schema = 'file'
-        endpoint_fs.schema      = 'file'
-
-        task_sandbox.host       = 'localhost'
-        pilot_sandbox.host      = 'localhost'
-        session_sandbox.host    = 'localhost'
-        resource_sandbox.host   = 'localhost'
-        endpoint_fs.host        = 'localhost'
-
-        src_context = {'pwd'      : str(task_sandbox),       # !!!
-                       'task'     : str(task_sandbox),
-                       'pilot'    : str(pilot_sandbox),
-                       'session'  : str(session_sandbox),
-                       'resource' : str(resource_sandbox),
-                       'endpoint' : str(endpoint_fs)}
-        tgt_context = {'pwd'      : str(task_sandbox),       # !!!
-                       'task'     : str(task_sandbox),
-                       'pilot'    : str(pilot_sandbox),
-                       'session'  : str(session_sandbox),
-                       'resource' : str(resource_sandbox),
-                       'endpoint' : str(endpoint_fs)}
+        # URL creation and manipulation is costly: the pilot level sandboxes
+        # are the same for all tasks, so we translate those only once.
+
+        key = (task['pilot_sandbox'], task['session_sandbox'],
+               task['resource_sandbox'], task['endpoint_fs'])
+
+        context = self._contexts.get(key)
+        if context is None:
+            pilot_sbox, session_sbox, resource_sbox, endpoint_fs = \
+                                       [str(self._localize(url)) for url in key]
+            context = {'pilot'    : pilot_sbox,
+                       'session'  : session_sbox,
+                       'resource' : resource_sbox,
+                       'endpoint' : endpoint_fs}
+            self._contexts[key] = context
+
+        task_sbox = str(self._localize(task['task_sandbox']))
 
+        # source and target paths are both expanded relative to the task
+        # sandbox, so a single context serves both
+        ctx = dict(context, pwd=task_sbox, task=task_sbox)   # !!!
+
+
+        # target directories created for this task
+        made_dirs = set()
 
         # we can now handle the actionable staging directives
         for sd in actionables:
@@ -152,8 +190,9 @@ class Default(AgentStagingInputComponent):
 
             self._prof.prof('staging_in_start', uid=uid, msg=did)
 
-            # agent stager only handles local actions
-            if action not in [rpc.COPY, rpc.LINK, rpc.MOVE]:
+            # agent stager only handles local actions (and extracts tarballs
+            # transferred by the tmgr stager)
+            if action not in [rpc.COPY, rpc.LINK, rpc.MOVE, rpc.TARBALL]:
                 self._prof.prof('staging_in_skip', uid=uid, msg=did)
                 continue
 
@@ -162,18 +201,23 @@ class Default(AgentStagingInputComponent):
             # and we assume the file to be copied is the base filename
             # of the source
             if tgt is None: tgt = ''
-            if tgt.strip() == '':
+            tgt_path = tgt.strip()
+            if not tgt_path:
                 tgt = 'task:///{}'.format(os.path.basename(src))
             # Fix for when the target PATH is exists *and* it is a folder
             # we assume the 'current directory' is the target folder
             # and we assume the file to be copied is the base filename
-            # of the source
-            elif os.path.exists(tgt.strip()) and os.path.isdir(tgt.strip()):
+            # of the source.  NOTE: `isdir` implies `exists` (single `stat`)
+            elif os.path.isdir(tgt_path):
                 tgt = os.path.join(tgt, os.path.basename(src))
 
 
-            src = complete_url(src, src_context, self._log)
-            tgt = complete_url(tgt, tgt_context, self._log)
+            src = complete_url(src, ctx, self._log)
+            tgt = complete_url(tgt, ctx, self._log)
+
+            # `Url.path` is re-parsed and normalized on each access
+            src_path = src.path
+            tgt_path = tgt.path
 
             # Currently, we use the same schema for files and folders.
             assert tgt.schema == 'file', 'staging tgt must be file://'
@@ -181,19 +225,26 @@ class Default(AgentStagingInputComponent):
             if action in [rpc.COPY, rpc.LINK, rpc.MOVE]:
                 assert src.schema == 'file', 'staging src expected as file://'
 
-            # implicitly create target dir if needed - but only for local ops
+            # implicitly create target dir if needed - but only for local ops,
+            # and only once per task.  NOTE: this includes the task sandbox,
+            #       which may not exist, yet
             if action != rpc.TRANSFER:
-                tgtdir = os.path.dirname(tgt.path)
-                if tgtdir != task_sandbox.path:
+                tgtdir = os.path.dirname(tgt_path)
+                if tgtdir not in made_dirs:
                     self._log.debug("mkdir %s", tgtdir)
-                    ru.rec_makedir(tgtdir)
+                    os.makedirs(tgtdir, exist_ok=True)
+                    made_dirs.add(tgtdir)
 
             if action == rpc.COPY:
+                # copy file data and permission bits like for single files
+                # below, but skip the per-file `copystat` of the default
+                # `copy2`.  NOTE: `shutil.copy` uses `os.sendfile` on Linux.
                 try:
-                    shutil.copytree(src.path, tgt.path)
+                    shutil.copytree(src_path, tgt_path,
+                                    copy_function=shutil.copy)
                 except OSError as exc:
                     if exc.errno == errno.ENOTDIR:
-                        shutil.copy(src.path, tgt.path)
+                        shutil.copy(src_path, tgt_path)
                     else:
                         raise
 
@@ -202,15 +253,15 @@ class Default(AgentStagingInputComponent):
                 # Fix issue/1513 if link source is file and target is folder.
                 # should support POSIX standard where link is created
                 # with the same name as the source
-                if os.path.isfile(src.path) and os.path.isdir(tgt.path):
-                    os.symlink(src.path,
-                               '%s/%s' % (tgt.path, os.path.basename(src.path)))
+                if os.path.isfile(src_path) and os.path.isdir(tgt_path):
+                    os.symlink(src_path,
+                               '%s/%s' % (tgt_path, os.path.basename(src_path)))
 
                 else:
-                    os.symlink(src.path, tgt.path)
+                    os.symlink(src_path, tgt_path)
 
             elif action == rpc.MOVE:
-                shutil.move(src.path, tgt.path)
+                shutil.move(src_path, tgt_path)
 
             elif action == rpc.TRANSFER:
 
@@ -231,20 +282,22 @@ class Default(AgentStagingInputComponent):
                 # path is expected to be an *absolute* path on the target system
                 # - any relative paths specified by the application are expected
                 # to get expanded on the client side.
-                tarball = '%s/%s.tar' % (os.path.dirname(tgt.path), uid)
+                tarball = '%s/%s.tar' % (os.path.dirname(tgt_path), uid)
                 self._log.debug('extract tarball for %s', tarball)
-                tar = tarfile.open(tarball)
-                tar.extractall(path='/')
-                tar.close()
+
+                # tarball staging is rare - only import `tarfile` when needed
+                import tarfile
+
+                # extract in a single forward pass over the (possibly large)
+                # tarball, without indexing its members first
+                with tarfile.open(tarball, mode='r|*') as tar:
+                    tar.extractall(path='/')
 
               # FIXME: make tarball removal dependent on debug settings
-              # os.remove(os.path.dirname(tgt.path) + '/' + uid + '.tar')
+              # os.remove(os.path.dirname(tgt_path) + '/' + uid + '.tar')
 
             self._prof.prof('staging_in_stop', uid=uid, msg=did)
 
-        # all staging is done -- pass on to the scheduler
-        self.advance(task, rps.AGENT_SCHEDULING_PENDING, publish=True, push=True)
-
 
 # ------------------------------------------------------------------------------
 
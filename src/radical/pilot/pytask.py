@@ -87,11 +87,19 @@ class PythonTask(object):
         if not callable(f):
             raise ValueError('task function not callable')
 
+        # the function does not change between calls: serialize it on first
+        # use only, and reuse the result for all tasks created from it
+        ser_func = None
+
         # ----------------------------------------------------------------------
         @functools.wraps(f)
         def decor(*args, **kwargs):
 
-            task = {'func'  : serialize_obj(f),
+            nonlocal ser_func
+            if ser_func is None:
+                ser_func = serialize_obj(f)
+
+            task = {'func'  : ser_func,
                     'args'  : args,
                     'kwargs': kwargs}
 
@@ -399,14 +399,16 @@ class Master(rpu.AgentComponent):
             td.verify()
 
             # the default worker needs its own task description to derive the
-            # amount of available resources
-            self._reg['raptor.%s.cfg' % td.uid] = td.as_dict()
+            # amount of available resources.  The registry serializes the
+            # value, so the task can use the same description dict.
+            td_dict = td.as_dict()
+            self._reg['raptor.%s.cfg' % td.uid] = td_dict
 
             # all workers run in the same sandbox as the master
             task = dict()
 
             task['origin']            = 'raptor'
-            task['description']       = td.as_dict()
+            task['description']       = td_dict
             task['state']             = rps.AGENT_STAGING_INPUT_PENDING
             task['status']            = self.NEW
             task['type']              = 'task'
@@ -540,13 +542,18 @@ class Master(rpu.AgentComponent):
 
     # --------------------------------------------------------------------------
     #
-    def join(self):
+    def join(self, timeout=None):
         '''
-        wait until the main work thread of this master completes
+        wait until the main work thread of this master completes, or until
+        `timeout` seconds passed (if specified).  Returns `True` if the thread
+        completed, `False` otherwise.
         '''
 
         if self._thread:
-            self._thread.join()
+            self._thread.join(timeout=timeout)
+            return not self._thread.is_alive()
+
+        return True
 
 
     # --------------------------------------------------------------------------
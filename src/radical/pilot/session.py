@@ -5,10 +5,13 @@ __license__   = "MIT"
 import os
 import copy
 import time
+import pprint
+import logging
 
 from typing import Optional
 
-import threading        as mt
+import threading          as mt
+import concurrent.futures as cf
 
 import radical.utils    as ru
 
@@ -48,6 +51,53 @@ class _CloseOptions(ru.TypedDict):
     }
 
 
+# ------------------------------------------------------------------------------
+#
+class _SandboxExpand(dict):
+    """Expansion mapping for `%(pd.<key>)s` sandbox templates.
+
+    Values are resolved from the pilot description on lookup, so only the keys
+    referenced by the template are computed.  `pd.<KEY>` and `pd.<key>` yield
+    the upper and lower case values, respectively.
+    """
+
+    def __init__(self, descr, resource):
+
+        super().__init__()
+
+        self._descr    = descr
+        self._resource = resource
+
+
+    def __missing__(self, name):
+
+        if not name.startswith('pd.'):
+            raise KeyError(name)
+
+        name = name[3:]
+        for k, v in self._descr.items():
+
+            if name not in (k, k.lower(), k.upper()):
+                continue
+
+            if v is None:
+                v = ''
+            if k == 'project':
+                if '_' in v and 'ornl' in self._resource:
+                    v = v.split('_')[0]
+                elif '-' in v and 'ncsa' in self._resource:
+                    v = v.split('-')[0]
+
+            if isinstance(v, str):
+                if   name == k.lower(): v = v.lower()
+                elif name == k.upper(): v = v.upper()
+
+            self['pd.%s' % name] = v
+            return v
+
+        raise KeyError('pd.%s' % name)
+
+
 # ------------------------------------------------------------------------------
 #
 class Session(object):
@@ -161,6 +211,7 @@ class Session(object):
         self._reg_addr      = _reg_addr
         self._proxy_url     = proxy_url
         self._proxy_cfg     = None
+        self._proxy_service = None  # embedded proxy service (primary only)
         self._closed        = False
         self._created       = time.time()
         self._close_options = _CloseOptions(close_options)
@@ -174,6 +225,9 @@ class Session(object):
         self._rm       = None    # resource manager (agent_0 sessions)
         self._hb       = None    # heartbeat monitor
 
+        # heartbeats and `close()` use the proxy client from different threads
+        self._proxy_lock = mt.Lock()
+
         # this session is either living in the client application or lives in
         # the scope of a pilot.  In the latter case we expect `RP_PILOT_ID` to
         # be set - we derive the session module scope from that env variable.
@@ -190,15 +244,20 @@ class Session(object):
         elif self._role == self._AGENT_N: self._init_agent_n()
         else                            : self._init_default()
 
-        # cache sandboxes etc.
-        self._cache_lock = ru.RLock()
-        self._cache      = {'endpoint_fs'      : dict(),
-                            'resource_sandbox' : dict(),
-                            'session_sandbox'  : dict(),
-                            'pilot_sandbox'    : dict(),
-                            'client_sandbox'   : self._cfg.client_sandbox,
-                            'js_shells'        : dict(),
-                            'fs_dirs'          : dict()}
+        # cache sandboxes etc.  Cache hits are not locked, and misses only lock
+        # their own cache entry: a slow miss (sandbox expansion) should not
+        # block lookups for other resources or sandbox types
+        self._cache       = {'endpoint_fs'        : dict(),
+                             'resource_sandbox'   : dict(),
+                             'session_sandbox'    : dict(),
+                             'pilot_sandbox'      : dict(),
+                             'pilot_sandbox_base' : dict(),
+                             'client_sandbox'     : self._cfg.client_sandbox,
+                             'js_shells'          : dict(),
+                             'js_urls'            : dict(),
+                             'fs_dirs'            : dict()}
+        self._cache_locks = dict()     # (bucket, key) -> lock
+        self._cache_lock  = mt.Lock()  # guards `_cache_locks`
 
         # at this point we have a bridge connection, logger, etc, and are done
         self._prof.prof('session_ok', uid=self._uid)
@@ -231,15 +290,23 @@ class Session(object):
         # FIXME: completion only needed by `PRIMARY`
         self._init_cfg_from_scratch()
 
-        # primary sessions create a registry service
-        self._start_registry()
-        self._connect_registry()
+        # only primary sessions start and initialize the proxy service.  That
+        # does not depend on the registry or heartbeat channel, so bring it up
+        # concurrently (`_start_proxy` registers under `_proxy_lock` and only
+        # then exposes the proxy client to heartbeats)
+        with cf.ThreadPoolExecutor(max_workers=1) as executor:
+
+            proxy_future = executor.submit(self._start_proxy)
 
-        # only primary sessions start and initialize the proxy service
-        self._start_proxy()
+            # primary sessions create a registry service
+            self._start_registry()
+            self._connect_registry()
 
-        # start heartbeat channel
-        self._start_heartbeat()
+            # start heartbeat channel
+            self._start_heartbeat()
+
+            # the proxy url is part of the published session config
+            proxy_future.result()
 
         # push the session config into the registry
         self._publish_cfg()
@@ -282,10 +349,17 @@ class Session(object):
         self._init_cfg_from_dict()
         self._start_registry()
         self._connect_registry()
-        self._connect_proxy()
-        self._start_heartbeat()
-        self._publish_cfg()
-        self._init_rm()
+
+        # the resource manager only needs the registry and the resource config:
+        # let it probe the allocation and its launch methods while we connect
+        # to the proxy and bring up the heartbeat channel
+        with cf.ThreadPoolExecutor(max_workers=1) as executor:
+            rm_future = executor.submit(self._init_rm)
+            self._connect_proxy()
+            self._start_heartbeat()
+            self._publish_cfg()
+            rm_future.result()
+
         self._start_components()
         self._crosswire_proxy()
 
@@ -381,7 +455,8 @@ class Session(object):
         self._cfg = ru.Config('radical.pilot.session', name=cfg_name,
                                                        cfg=self._cfg)
 
-        rcfgs = ru.Config('radical.pilot.resource', name='*', expand=False)
+        # resource configs are parsed once per process and cached
+        rcfgs = rpu.get_resource_configs()
         self._rcfgs = ru.Config()
 
         for site in rcfgs:
@@ -553,9 +628,11 @@ class Session(object):
             # publish own heartbeat
             self._hb_pub.put('heartbeat', HeartbeatMessage(uid=self._uid))
 
-            # also update proxy heartbeat
-            if self._proxy:
-                self._proxy.request('heartbeat', {'sid': self._uid})
+            # also update proxy heartbeat - `close()` may concurrently
+            # unregister from and close the proxy client
+            with self._proxy_lock:
+                if self._proxy:
+                    self._proxy.request('heartbeat', {'sid': self._uid})
         # --------------------------------------
 
         # --------------------------------------
@@ -605,12 +682,11 @@ class Session(object):
 
         assert self._role in [self._PRIMARY, self._AGENT_0]
 
-        # push proxy, bridges, components and heartbeat subsections separately
-        flat_cfg = copy.deepcopy(self._cfg)
-
-        del flat_cfg['heartbeat']
-        del flat_cfg['bridges']
-        del flat_cfg['components']
+        # push proxy, bridges, components and heartbeat subsections separately.
+        # The registry serializes all values, so we don't need to (deep-)copy
+        # the config, but only need to leave out those subsections.
+        skip     = ['heartbeat', 'bridges', 'components']
+        flat_cfg = {k: v for k, v in self._cfg.items() if k not in skip}
 
         self._reg['cfg']        = flat_cfg
         self._reg['heartbeat']  = self._cfg.heartbeat
@@ -672,10 +748,14 @@ class Session(object):
         self._rep.info ('<<zmq proxy  : ')
         self._rep.plain('[%s]' % self._proxy_url)
 
-        # configure proxy channels
+        # configure proxy channels.  The heartbeat may already be running and
+        # shares the (REQ socket based) proxy client, so only expose the client
+        # once registration completed, and block heartbeats until then
         try:
-            self._proxy = ru.zmq.Client(url=self._cfg.proxy_url)
-            self._proxy_cfg = self._proxy.request('register', {'sid':self._uid})
+            with self._proxy_lock:
+                proxy = ru.zmq.Client(url=self._cfg.proxy_url)
+                self._proxy_cfg = proxy.request('register', {'sid': self._uid})
+                self._proxy     = proxy
 
         except:
             self._log.exception('%s: failed to start proxy', self._role)
@@ -814,8 +894,9 @@ class Session(object):
                                           rcfg=self._rcfg,
                                           log=self._log, prof=self._prof)
 
-        import pprint
-        self._log.debug(pprint.pformat(self._rm.info))
+        # the RM info can be large (node lists) - only format it when needed
+        if self._log.isEnabledFor(logging.DEBUG):
+            self._log.debug(pprint.pformat(self._rm.info))
 
 
     # --------------------------------------------------------------------------
@@ -831,6 +912,13 @@ class Session(object):
 
         assert self._role in [self._PRIMARY, self._AGENT_0, self._AGENT_N]
 
+        # nothing to manage (e.g., sub-agents which only run executors are
+        # configured by agent_0): skip the component manager and its registry
+        # and heartbeat connections
+        if not self._cfg.get('bridges') and not self._cfg.get('components'):
+            self._log.debug('session %s: no bridges or components', self._uid)
+            return
+
         # primary sessions and agents have a component manager which also
         # manages heartbeat.  'self._cmgr.close()` should be called during
         # termination
@@ -890,15 +978,30 @@ class Session(object):
                 self._ctrl_pub.put(rpc.CONTROL_PUBSUB, {'cmd': 'terminate',
                                                         'arg': None})
 
-        for tmgr_uid, tmgr in self._tmgrs.items():
+        # ----------------------------------------------------------------------
+        def _close_tmgr(tmgr_uid, tmgr):
             self._log.debug("session %s closes tmgr   %s", self._uid, tmgr_uid)
             tmgr.close()
             self._log.debug("session %s closed tmgr   %s", self._uid, tmgr_uid)
 
-        for pmgr_uid, pmgr in self._pmgrs.items():
+        def _close_pmgr(pmgr_uid, pmgr):
             self._log.debug("session %s closes pmgr   %s", self._uid, pmgr_uid)
             pmgr.close(terminate=options.terminate)
             self._log.debug("session %s closed pmgr   %s", self._uid, pmgr_uid)
+        # ----------------------------------------------------------------------
+
+        # managers are closed concurrently (they mostly wait for their
+        # components to terminate), but all task managers are closed before
+        # the pilot managers
+        n_workers = max(1, len(self._tmgrs), len(self._pmgrs))
+        with cf.ThreadPoolExecutor(max_workers=n_workers) as executor:
+
+            for mgrs, close_mgr in [(self._tmgrs, _close_tmgr),
+                                    (self._pmgrs, _close_pmgr)]:
+                futures = [executor.submit(close_mgr, uid, mgr)
+                           for uid, mgr in mgrs.items()]
+                for future in futures:
+                    future.result()
 
         if self._cmgr:
             self._cmgr.close()
@@ -908,18 +1011,29 @@ class Session(object):
             self._hb.stop()
             self._hb_pubsub.stop()
 
-        if self._proxy:
+        # NOTE: `self._hb.stop()` does not wait for the heartbeat thread, so
+        #       a last proxy heartbeat may still be in flight
+        with self._proxy_lock:
 
-            if self._role == self._PRIMARY:
-                try:
-                    self._log.debug('session %s closes service', self._uid)
-                    self._proxy.request('unregister', {'sid': self._uid})
-                except:
-                    pass
+            if self._proxy:
+
+                if self._role == self._PRIMARY:
+                    try:
+                        self._log.debug('session %s closes service', self._uid)
+                        self._proxy.request('unregister', {'sid': self._uid})
+                    except:
+                        pass
 
-            if self._role in [self._PRIMARY, self._AGENT_0]:
-                self._proxy.close()
-                self._proxy = None
+                if self._role in [self._PRIMARY, self._AGENT_0]:
+                    self._proxy.close()
+                    self._proxy = None
+
+        # a proxy service started by this session lives as long as the session
+        if self._proxy_service:
+            self._log.debug('session %s stops proxy service', self._uid)
+            self._proxy_service.stop()
+            self._proxy_thread.join()
+            self._proxy_service = None
 
         self._log.debug("session %s closed", self._uid)
         self._prof.prof("session_stop", uid=self._uid)
@@ -960,10 +1074,12 @@ class Session(object):
         try:
             proxy.start()
 
-            self._proxy_url = proxy.addr
+            self._proxy_service = proxy
+            self._proxy_url     = proxy.addr
             self._proxy_event.set()
 
-            # run forever until process is interrupted or killed
+            # run until the session closes, or the process is interrupted or
+            # killed
             proxy.wait()
 
         finally:
@@ -979,7 +1095,7 @@ class Session(object):
         object_dict = {
             'uid'      : self._uid,
             'proxy_url': str(self.proxy_url),
-            'cfg'      : copy.deepcopy(self._cfg)
+            'cfg'      : self._cfg.as_dict()  # deep copy
         }
         return object_dict
 
@@ -1146,7 +1262,7 @@ class Session(object):
 
         """
 
-        return list(self._pmgrs.keys())
+        return list(self._pmgrs)
 
 
     # --------------------------------------------------------------------------
@@ -1164,16 +1280,11 @@ class Session(object):
 
         """
 
-        return_scalar = False
         if isinstance(pmgr_uids, str):
-            pmgr_uids     = [pmgr_uids]
-            return_scalar = True
-
-        if pmgr_uids: pmgrs = [self._pmgrs[uid] for uid in pmgr_uids]
-        else        : pmgrs =  list(self._pmgrs.values())
+            return self._pmgrs[pmgr_uids]
 
-        if return_scalar: return pmgrs[0]
-        else            : return pmgrs
+        if pmgr_uids: return [self._pmgrs[uid] for uid in pmgr_uids]
+        else        : return list(self._pmgrs.values())
 
 
     # --------------------------------------------------------------------------
@@ -1206,7 +1317,7 @@ class Session(object):
 
         """
 
-        return list(self._tmgrs.keys())
+        return list(self._tmgrs)
 
 
     # --------------------------------------------------------------------------
@@ -1215,7 +1326,8 @@ class Session(object):
         """Get known TaskManager(s).
 
         Arguments:
-            tmgr_uids (str | list[str]): uids of the TaskManagers we want
+            tmgr_uids (str | Iterable[str], optional): uids of the TaskManagers
+                we want.
 
         Returns:
             radical.pilot.TaskManager | list[radical.pilot.TaskManager]:
@@ -1223,16 +1335,11 @@ class Session(object):
 
         """
 
-        return_scalar = False
-        if not isinstance(tmgr_uids, list):
-            tmgr_uids     = [tmgr_uids]
-            return_scalar = True
-
-        if tmgr_uids: tmgrs = [self._tmgrs[uid] for uid in tmgr_uids]
-        else        : tmgrs =  list(self._tmgrs.values())
+        if isinstance(tmgr_uids, str):
+            return self._tmgrs[tmgr_uids]
 
-        if return_scalar: return tmgrs[0]
-        else            : return tmgrs
+        if tmgr_uids: return [self._tmgrs[uid] for uid in tmgr_uids]
+        else        : return list(self._tmgrs.values())
 
 
     # --------------------------------------------------------------------------
@@ -1330,6 +1437,16 @@ class Session(object):
         return self._cache['client_sandbox']
 
 
+    # --------------------------------------------------------------------------
+    #
+    def _get_cache_lock(self, bucket, key):
+
+        with self._cache_lock:
+            if (bucket, key) not in self._cache_locks:
+                self._cache_locks[(bucket, key)] = mt.Lock()
+            return self._cache_locks[(bucket, key)]
+
+
     # --------------------------------------------------------------------------
     #
     def _get_resource_sandbox(self, pilot):
@@ -1349,7 +1466,11 @@ class Session(object):
 
         # the global sandbox will be the same for all pilots on any resource, so
         # we cache it
-        with self._cache_lock:
+        cached = self._cache['resource_sandbox'].get(resource)
+        if cached is not None:
+            return cached
+
+        with self._get_cache_lock('resource_sandbox', resource):
 
             if resource not in self._cache['resource_sandbox']:
 
@@ -1367,23 +1488,8 @@ class Session(object):
                 # description
                 if '%' in sandbox_raw:
                     # expand from pilot description
-                    expand = dict()
-                    for k, v in pilot['description'].items():
-                        if v is None:
-                            v = ''
-                        if k == 'project':
-                            if '_' in v and 'ornl' in resource:
-                                v = v.split('_')[0]
-                            elif '-' in v and 'ncsa' in resource:
-                                v = v.split('-')[0]
-                        expand['pd.%s' % k] = v
-                        if isinstance(v, str):
-                            expand['pd.%s' % k.upper()] = v.upper()
-                            expand['pd.%s' % k.lower()] = v.lower()
-                        else:
-                            expand['pd.%s' % k.upper()] = v
-                            expand['pd.%s' % k.lower()] = v
-                    sandbox_raw = sandbox_raw % expand
+                    sandbox_raw = sandbox_raw % _SandboxExpand(
+                                                pilot['description'], resource)
 
 
                 # If the sandbox contains expandables, we need to resolve those
@@ -1427,13 +1533,17 @@ class Session(object):
         if not resource:
             raise ValueError('Cannot get session sandbox w/o resource target')
 
-        with self._cache_lock:
+        cached = self._cache['session_sandbox'].get(resource)
+        if cached is not None:
+            return cached
+
+        with self._get_cache_lock('session_sandbox', resource):
 
             if resource not in self._cache['session_sandbox']:
 
                 # cache miss
                 resource_sandbox      = self._get_resource_sandbox(pilot)
-                session_sandbox       = ru.Url(resource_sandbox)
+                session_sandbox       = copy.copy(resource_sandbox)
                 session_sandbox.path += '/%s' % self.uid
 
                 self._cache['session_sandbox'][resource] = session_sandbox
@@ -1447,18 +1557,23 @@ class Session(object):
 
         # FIXME: this should get 'pid, resource, schema=None' as parameters
 
+        # NOTE: `str(None)` is not empty
         pilot_sandbox = pilot.get('pilot_sandbox')
-        if str(pilot_sandbox):
+        if pilot_sandbox and str(pilot_sandbox):
             return ru.Url(pilot_sandbox)
 
         pid = pilot['uid']
-        with self._cache_lock:
+        cached = self._cache['pilot_sandbox'].get(pid)
+        if cached is not None:
+            return cached
+
+        with self._get_cache_lock('pilot_sandbox', pid):
 
             if pid not in self._cache['pilot_sandbox']:
 
                 # cache miss
                 session_sandbox     = self._get_session_sandbox(pilot)
-                pilot_sandbox       = ru.Url(session_sandbox)
+                pilot_sandbox       = copy.copy(session_sandbox)
                 pilot_sandbox.path += '/%s/' % pilot['uid']
 
                 self._cache['pilot_sandbox'][pid] = pilot_sandbox
@@ -1466,6 +1581,28 @@ class Session(object):
             return self._cache['pilot_sandbox'][pid]
 
 
+    # --------------------------------------------------------------------------
+    #
+    def _get_pilot_sandbox_base(self, pilot):
+        """Pilot sandbox as URL string with a trailing slash.
+
+        Default task sandboxes are derived from this base without any URL
+        parsing.
+        """
+
+        # NOTE: concurrent cache misses compute the same string, so we don't
+        #       need to lock
+        key    = str(pilot.get('pilot_sandbox') or '') or pilot['uid']
+        cached = self._cache['pilot_sandbox_base'].get(key)
+        if cached is None:
+            cached = str(self._get_pilot_sandbox(pilot))
+            if not cached.endswith('/'):
+                cached += '/'
+            self._cache['pilot_sandbox_base'][key] = cached
+
+        return cached
+
+
     # --------------------------------------------------------------------------
     #
     def _get_endpoint_fs(self, pilot):
@@ -1477,13 +1614,17 @@ class Session(object):
         if not resource:
             raise ValueError("Can't get fs-endpoint w/o resource target")
 
-        with self._cache_lock:
+        cached = self._cache['endpoint_fs'].get(resource)
+        if cached is not None:
+            return cached
+
+        with self._get_cache_lock('endpoint_fs', resource):
 
             if resource not in self._cache['endpoint_fs']:
 
                 # cache miss
                 resource_sandbox  = self._get_resource_sandbox(pilot)
-                endpoint_fs       = ru.Url(resource_sandbox)
+                endpoint_fs       = copy.copy(resource_sandbox)
                 endpoint_fs.path  = ''
 
                 self._cache['endpoint_fs'][resource] = endpoint_fs
@@ -1497,29 +1638,34 @@ class Session(object):
 
         # If a sandbox is specified in the task description, then interpret
         # relative paths as relativet to the pilot sandbox.
+        #
+        # NOTE: the task sandbox is always returned as URL string - that is
+        #       what gets cached in the task dict, so cache hits return as-is
 
         # task sandboxes are cached in the task dict
         task_sandbox = task.get('task_sandbox')
         if task_sandbox:
-            return task_sandbox
+            return str(task_sandbox)
 
         # specified in description?
-        if not task_sandbox:
-            sandbox  = task['description'].get('sandbox')
-            if sandbox:
-                task_sandbox = ru.Url(self._get_pilot_sandbox(pilot))
-                if sandbox[0] == '/':
-                    task_sandbox.path = sandbox
-                else:
-                    task_sandbox.path += '/%s/' % sandbox
+        sandbox = task['description'].get('sandbox')
+        if sandbox:
+            # NOTE: `ru.Url` only wraps an immutable parse result, so a shallow
+            #       copy is a proper (and cheap) clone of the pilot sandbox URL
+            task_sandbox = copy.copy(self._get_pilot_sandbox(pilot))
+            if sandbox[0] == '/':
+                task_sandbox.path = sandbox
+            else:
+                task_sandbox.path += '/%s/' % sandbox
+            task_sandbox = str(task_sandbox)
 
-        # default
-        if not task_sandbox:
-            task_sandbox = ru.Url(self._get_pilot_sandbox(pilot))
-            task_sandbox.path += "/%s/" % task['uid']
+        # default: plain string concatenation on the pilot sandbox base
+        else:
+            task_sandbox = '%s%s/' % (self._get_pilot_sandbox_base(pilot),
+                                      task['uid'])
 
         # cache
-        task['task_sandbox'] = str(task_sandbox)
+        task['task_sandbox'] = task_sandbox
 
         return task_sandbox
 
@@ -1531,6 +1677,23 @@ class Session(object):
 
         resrc   = pilot['description']['resource']
         schema  = pilot['description']['access_schema']
+
+        # the URLs only depend on the resource config.  NOTE: concurrent cache
+        #       misses compute the same URLs, so we don't need to lock
+        cached = self._cache['js_urls'].get((resrc, schema))
+        if cached is None:
+            cached = self._get_jsurl_from_rcfg(resrc, schema)
+            self._cache['js_urls'][(resrc, schema)] = cached
+
+        js_url, js_hop = cached
+
+        return copy.copy(js_url), copy.copy(js_hop)
+
+
+    # --------------------------------------------------------------------------
+    #
+    def _get_jsurl_from_rcfg(self, resrc, schema):
+
         rcfg    = self.get_resource_config(resrc, schema)
 
         js_url  = ru.Url(rcfg.get('job_manager_endpoint'))
@@ -1539,11 +1702,12 @@ class Session(object):
         # make sure the js_hop url points to an interactive access
         # TODO: this is an unreliable heuristics - we should require the js_hop
         #       URL to be specified in the resource configs.
-        if   '+gsissh' in js_hop.schema or \
-             'gsissh+' in js_hop.schema    : js_hop.schema = 'gsissh'
-        elif '+ssh'    in js_hop.schema or \
-             'ssh+'    in js_hop.schema    : js_hop.schema = 'ssh'
-        else                               : js_hop.schema = 'fork'
+        #       Only compound schemas (`slurm+ssh`) select a shell schema.
+        elems = js_hop.schema.split('+')
+        if   len(elems) < 2     : js_hop.schema = 'fork'
+        elif 'gsissh' in elems  : js_hop.schema = 'gsissh'
+        elif 'ssh'    in elems  : js_hop.schema = 'ssh'
+        else                    : js_hop.schema = 'fork'
 
         return js_url, js_hop
 
@@ -186,11 +186,12 @@ def complete_url(path   : str,
     if log:
         log.debug('  -> %s', purl)
 
-    if purl.schema not in list(context.keys()):
+    # NOTE: this runs for each staging directive: keep log arguments lazy
+    if purl.schema not in context:
 
         ret = purl
         if log:
-            log.debug('             = %s (%s)', ret, list(context.keys()))
+            log.debug('             = %s (%s)', ret, context.keys())
 
     else:
 
@@ -202,7 +203,7 @@ def complete_url(path   : str,
                 raise ValueError('URLs cannot specify `host` for expanded schemas')
             except:
                 if log:
-                    log.exception('purl host: %s' % str(purl))
+                    log.exception('purl host: %s', purl)
                 raise
 
         if purl.schema == 'file':
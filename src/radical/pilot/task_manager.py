@@ -18,6 +18,24 @@ from . import constants as rpc
 from .task_description import TaskDescription, RAPTOR_MASTER, RAPTOR_WORKER
 from .raptor_tasks     import RaptorMaster, RaptorWorker
 
+# orjson is optional - it speeds up the (potentially large) task dump on close
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _orjson_default(obj):
+    # orjson would encode `ru.TypedDict` instances (like `ru.Config`) as empty
+    # dicts, as their data do not live in the underlying dict.  Subclasses of
+    # native types are thus passed through to here and converted explicitly.
+    if isinstance(obj, ru.TypedDict):
+        return obj.as_dict()
+    for base in (dict, list, str, int, float):
+        if isinstance(obj, base):
+            return base(obj)
+    raise TypeError('cannot serialize %s' % type(obj))
+
 
 # bulk callbacks are implemented, but are currently not used nor exposed.
 _USE_BULK_CB = False
@@ -253,7 +271,31 @@ class TaskManager(rpu.ClientComponent):
         json['tasks'] = self._task_info
 
         tgt = '%s/%s.json' % (self._session.path, self.uid)
-        ru.write_json(json, tgt)
+        self._dump_json(json, tgt)
+
+
+    # --------------------------------------------------------------------------
+    #
+    def _dump_json(self, data, tgt):
+
+        if orjson:
+            try:
+                # encode in one pass in native code, and write the bytes as-is
+                out = orjson.dumps(data, default=_orjson_default,
+                                   option=orjson.OPT_INDENT_2              |
+                                          orjson.OPT_SORT_KEYS             |
+                                          orjson.OPT_NON_STR_KEYS          |
+                                          orjson.OPT_PASSTHROUGH_SUBCLASS  |
+                                          orjson.OPT_APPEND_NEWLINE)
+                with open(tgt, 'wb') as fout:
+                    fout.write(out)
+                return
+
+            except TypeError:
+                # not serializable by orjson, try the stdlib encoder
+                self._log.warn('orjson dump failed for %s', tgt)
+
+        ru.write_json(data, tgt)
 
 
     # --------------------------------------------------------------------------
@@ -843,8 +885,12 @@ class TaskManager(rpu.ClientComponent):
         # we return a list of tasks
         tasks = list()
         ret   = list()
-        self._rep.progress_tgt(len(descriptions), label='submit')
-        for td in descriptions:
+
+        # report progress in steps (at most 64), not for every single task
+        n_descr = len(descriptions)
+        step    = max(1, n_descr // 64)
+        self._rep.progress_tgt((n_descr + step - 1) // step, label='submit')
+        for idx, td in enumerate(descriptions):
 
             mode = td.mode
 
@@ -858,7 +904,9 @@ class TaskManager(rpu.ClientComponent):
                 task = Task(tmgr=self, descr=td, origin='client')
 
             tasks.append(task)
-            self._rep.progress()
+
+            if not idx % step:
+                self._rep.progress()
 
             if len(tasks) >= 1024:
                 # submit this bulk
@@ -238,8 +238,7 @@ class BaseComponent(object):
     #
     def wait(self):
 
-        while not self._term.is_set():
-            time.sleep(1)
+        self._term.wait()
 
 
     # --------------------------------------------------------------------------
@@ -818,9 +817,10 @@ class BaseComponent(object):
             # ------------------------------------------------------------------
             # NOTE: idle timing is a tricky beast: if we sleep for too long,
             #       then we have to wait that long on stop() for the thread to
-            #       get active again and terminate/join.  So we always sleep
-            #       just a little, and explicitly check if sufficient time has
-            #       passed to activate the callback.
+            #       get active again and terminate/join.  We thus wait on the
+            #       termination event until the next activation is due, which
+            #       returns immediately on stop() and avoids waking up idle
+            #       threads in between.
             class Idler(mt.Thread):
 
                 # --------------------------------------------------------------
@@ -846,11 +846,13 @@ class BaseComponent(object):
                         self._log.debug('start idle thread: %s', self._cb)
                         ret = True
                         while ret and not self._term.is_set():
-                            if self._timeout and \
-                               self._timeout > (time.time() - self._last):
-                                # not yet
-                                time.sleep(0.01)  # FIXME: make configurable
-                                continue
+                            if self._timeout:
+                                remaining = self._timeout - \
+                                            (time.time() - self._last)
+                                if remaining > 0:
+                                    # not yet
+                                    self._term.wait(timeout=remaining)
+                                    continue
 
                             with self._cb_lock:
                                 if self._cb_data is not None:
@@ -109,8 +109,8 @@ def get_resource_configs() -> ru.Config:
     if not _rcfgs:
         _rcfgs = ru.Config('radical.pilot.resource', name='*', expand=False)
 
-    # return a deep copy
-    return ru.Config(from_dict=_rcfgs)
+    # return a deep copy (`as_dict` also copies nested lists)
+    return ru.Config(from_dict=_rcfgs.as_dict())
 
 
 # ------------------------------------------------------------------------------
@@ -5,6 +5,8 @@ import json
 import os
 import sys
 
+import concurrent.futures as cf
+
 import radical.utils as ru
 
 from ..                 import states as s
@@ -584,11 +586,21 @@ def get_session_description(sid, src=None):
     json['pilot']   = list()
     json['task']    = list()
 
-    for fname in glob.glob(str('%s/tmgr.*.json' % src)):
-        json['tmgr'].append(ru.read_json(fname))
-
-    for fname in glob.glob(str('%s/pmgr.*.json' % src)):
-        json['pmgr'].append(ru.read_json(fname))
+    # find the `tmgr.*.json` and `pmgr.*.json` dumps in a single pass over the
+    # session dir.  Read them concurrently - task dumps can be large, and the
+    # session dir often lives on a shared file system
+    fnames = {'tmgr': list(),
+              'pmgr': list()}
+    with os.scandir(src) as entries:
+        for entry in entries:
+            prefix, _, rest = entry.name.partition('.')
+            if prefix in fnames and rest.endswith('.json'):
+                fnames[prefix].append(entry.path)
+
+    with cf.ThreadPoolExecutor() as executor:
+        for etype in fnames:
+            json[etype] = list(executor.map(ru.read_json,
+                                            sorted(fnames[etype])))
 
     for tmgr in json['tmgr']:
         json['task'].extend(tmgr['tasks'].values())
@@ -123,10 +123,26 @@ class StagingHelper_SAGA(object):
         _has_saga = False
 
     def __init__(self, log):
-        self._log = log
+        self._log     = log
+        self._fs_dirs = dict()  # normalized root URL -> Directory
         if not self._has_saga:
             raise Exception('SAGA-Python not available')
 
+    def _get_fs_dir(self, url):
+
+        # each Directory opens a remote filesystem handle - share one per
+        # (normalized) filesystem root
+        root        = ru.Url(url)
+        root.path   = '/'
+        root.schema = (root.schema or '').lower()
+        root.host   = (root.host   or '').lower()
+        key         = str(root)
+
+        if key not in self._fs_dirs:
+            self._fs_dirs[key] = self._rsfs.Directory(key)
+
+        return self._fs_dirs[key]
+
     def mkdir(self, tgt, flags):
         assert self._has_saga
 
@@ -138,10 +154,7 @@ class StagingHelper_SAGA(object):
     def copy(self, src, tgt, flags):
         assert self._has_saga
 
-        tmp      = ru.Url(tgt)
-        tmp.path = '/'
-
-        fs     = self._rsfs.Directory(str(tmp))
+        fs     = self._get_fs_dir(tgt)
         flags |= self._rsfs.CREATE_PARENTS
 
         if os.path.isdir(src) or src.endswith('/'):
@@ -5,6 +5,9 @@ __license__   = 'MIT'
 
 import glob
 import os
+import time
+
+import threading as mt
 
 from unittest import mock, TestCase
 
@@ -82,11 +85,62 @@ class TestComponent(TestCase):
 
                 os.unlink(fname)
 
+    # --------------------------------------------------------------------------
+    #
+    @mock.patch.object(BaseComponent, '__init__', return_value=None)
+    def test_timed_cb(self, mocked_init):
+
+        component = BaseComponent(None, None)
+        component._uid     = 'component.0000'
+        component._log     = mock.Mock()
+        component._cb_lock = mt.RLock()
+        component._threads = dict()
+
+        calls = list()
+        done  = mt.Event()
+
+        def _fast_cb():
+            calls.append(time.time())
+            if len(calls) == 3:
+                done.set()
+            return True
+
+        # the callback is invoked repeatedly, but never more often than once
+        # per `timer` period
+        component.register_timed_cb(_fast_cb, timer=0.1)
+        self.assertTrue(done.wait(timeout=10))
+
+        idler = component._threads.pop('component.0000.idler._fast_cb')
+        idler.stop()
+        idler.join(timeout=10)
+        self.assertFalse(idler.is_alive())
+
+        for t1, t2 in zip(calls, calls[1:]):
+            self.assertGreaterEqual(t2 - t1, 0.1)
+
+        # the callback is invoked right away, and the idler terminates on
+        # `stop()` while waiting for its next activation (long before the next
+        # timer period)
+        first = mt.Event()
+
+        def _slow_cb():
+            first.set()
+            return True
+
+        component.register_timed_cb(_slow_cb, timer=600)
+        self.assertTrue(first.wait(timeout=10))
+
+        idler = component._threads['component.0000.idler._slow_cb']
+        idler.stop()
+        idler.join(timeout=10)
+        self.assertFalse(idler.is_alive())
+
 
 if __name__ == '__main__':
 
     tc = TestComponent()
     tc.test_output()
+    tc.test_timed_cb()
 
 
 # ------------------------------------------------------------------------------
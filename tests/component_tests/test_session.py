@@ -10,11 +10,12 @@ import os
 import shutil
 import tempfile
 
+import threading     as mt
 import radical.utils as ru
 
 from unittest import TestCase, mock
 
-from radical.pilot.session import Session
+from radical.pilot.session import Session, _SandboxExpand
 
 
 # ------------------------------------------------------------------------------
@@ -115,6 +116,38 @@ class TestSession(TestCase):
             os.environ['SLURM_JOB_ID'] = saved_batch_id
 
 
+    # --------------------------------------------------------------------------
+    #
+    @mock.patch.object(Session, '__init__', return_value=None)
+    def test_get_managers(self, mocked_init):
+
+        s = Session()
+        s._pmgrs = {'pmgr.0000': 'pmgr_0', 'pmgr.0001': 'pmgr_1'}
+        s._tmgrs = {'tmgr.0000': 'tmgr_0', 'tmgr.0001': 'tmgr_1'}
+
+        for get_mgrs, prefix in [(s.get_pilot_managers, 'pmgr'),
+                                 (s.get_task_managers,  'tmgr')]:
+
+            self.assertEqual(get_mgrs('%s.0001' % prefix), '%s_1' % prefix)
+            self.assertEqual(get_mgrs(['%s.0001' % prefix]), ['%s_1' % prefix])
+            self.assertEqual(get_mgrs(), ['%s_0' % prefix, '%s_1' % prefix])
+
+            with self.assertRaises(KeyError):
+                get_mgrs('%s.0002' % prefix)
+
+    # --------------------------------------------------------------------------
+    #
+    def test_as_dict(self):
+
+        s_dict = self._session.as_dict()
+        self.assertEqual(s_dict['uid'], self._session.uid)
+        self.assertEqual(s_dict['cfg'], self._session.cfg.as_dict())
+
+        # the config is a plain, independent copy
+        self.assertNotIsInstance(s_dict['cfg'], ru.Config)
+        s_dict['cfg']['heartbeat']['interval'] = -1
+        self.assertNotEqual(self._session.cfg.heartbeat.interval, -1)
+
     # --------------------------------------------------------------------------
     #
     def test_close(self):
@@ -131,11 +164,42 @@ class TestSession(TestCase):
         self._session._hb          = mock.Mock()
         self._session._hb_pubsub   = mock.Mock()
         self._session._reg_service = mock.Mock()
+        self._session._proxy       = mock.Mock()
+
+        proxy = self._session._proxy
+
+        self._session._proxy_service = mock.Mock()
+        self._session._proxy_thread  = mock.Mock()
+
+        proxy_service = self._session._proxy_service
+        proxy_thread  = self._session._proxy_thread
+
+        # task managers are closed before pilot managers
+        mgrs = mock.Mock()
+        self._session._tmgrs = {'tmgr.0000': mgrs.tmgr_0,
+                                'tmgr.0001': mgrs.tmgr_1}
+        self._session._pmgrs = {'pmgr.0000': mgrs.pmgr_0}
 
         # only `True` values are targeted
         self._session.close(download=True)
         self._session.close(terminate=True)
 
+        self.assertEqual(sorted(mgrs.method_calls[:2]),
+                         [mock.call.tmgr_0.close(), mock.call.tmgr_1.close()])
+        self.assertEqual(mgrs.method_calls[2:],
+                         [mock.call.pmgr_0.close(terminate=True)])
+
+        proxy.request.assert_called_once_with('unregister',
+                                              {'sid': self._session.uid})
+        proxy.close.assert_called_once()
+        self.assertIsNone(self._session._proxy)
+        self.assertFalse(self._session._proxy_lock.locked())
+
+        # embedded proxy service is stopped
+        proxy_service.stop.assert_called_once()
+        proxy_thread.join.assert_called_once()
+        self.assertIsNone(self._session._proxy_service)
+
     # --------------------------------------------------------------------------
     #
     def test_get_resource_sandbox(self):
@@ -177,6 +241,274 @@ class TestSession(TestCase):
                          self._session._get_resource_sandbox(pilot).path)
         self._session._cache['resource_sandbox'] = {}
 
+        # cache misses do not wait for misses on other resources
+        pilot['description'].update({'resource': 'local.localhost'})
+        with self._session._get_cache_lock('resource_sandbox', 'ncsa.delta'):
+            sandbox = self._session._get_resource_sandbox(pilot)
+
+        # cache hits do not wait for misses in progress
+        with self._session._get_cache_lock('resource_sandbox',
+                                           'local.localhost'):
+            self.assertIs(self._session._get_resource_sandbox(pilot), sandbox)
+        self._session._cache['resource_sandbox'] = {}
+
+    # --------------------------------------------------------------------------
+    #
+    def test_sandbox_expand(self):
+
+        descr  = {'project': 'ABC_123', 'queue': None, 'cores': 4}
+        expand = _SandboxExpand(descr, 'ornl.summit')
+
+        self.assertEqual('/%(pd.project)s/%(pd.PROJECT)s/%(pd.queue)s/'
+                         '%(pd.cores)d' % expand, '/abc/ABC//4')
+        # only referenced keys are resolved
+        self.assertEqual(sorted(expand), ['pd.PROJECT', 'pd.cores',
+                                          'pd.project', 'pd.queue'])
+
+        expand = _SandboxExpand(descr, 'ncsa.delta')
+        self.assertEqual('%(pd.project)s' % expand, 'abc_123')
+
+        with self.assertRaises(KeyError):
+            _ = '%(pd.unknown)s' % expand
+
+    # --------------------------------------------------------------------------
+    #
+    def test_get_task_sandbox(self):
+
+        pilot = {'uid'          : 'pilot.0000',
+                 'pilot_sandbox': 'ssh://host.xyz/sbox/pilot.0000/',
+                 'description'  : {}}
+
+        task = {'uid': 'task.0000', 'description': {}}
+        self.assertEqual(str(self._session._get_task_sandbox(task, pilot)),
+                         'ssh://host.xyz/sbox/pilot.0000/task.0000/')
+        self.assertEqual(task['task_sandbox'],
+                         'ssh://host.xyz/sbox/pilot.0000/task.0000/')
+
+        # the pilot sandbox base is only derived once per pilot
+        pilot_nos = {'uid'          : 'pilot.0000',
+                     'pilot_sandbox': 'ssh://host.xyz/sbox/pilot.0000',
+                     'description'  : {}}
+        with mock.patch.object(self._session, '_get_pilot_sandbox',
+                               wraps=self._session._get_pilot_sandbox) as gps:
+            for p in [pilot, pilot_nos, pilot_nos]:
+                task = {'uid': 'task.0009', 'description': {}}
+                self.assertEqual(self._session._get_task_sandbox(task, p),
+                                 'ssh://host.xyz/sbox/pilot.0000/task.0009/')
+            self.assertEqual(gps.call_count, 1)
+
+        task = {'uid': 'task.0001', 'description': {'sandbox': 'shared'}}
+        self.assertEqual(str(self._session._get_task_sandbox(task, pilot)),
+                         'ssh://host.xyz/sbox/pilot.0000/shared/')
+
+        task = {'uid': 'task.0002', 'description': {'sandbox': '/tmp/abs'}}
+        self.assertEqual(self._session._get_task_sandbox(task, pilot),
+                         'ssh://host.xyz/tmp/abs')
+
+        # cache hits are returned as-is, without consulting the pilot
+        with mock.patch.object(self._session, '_get_pilot_sandbox') as gps:
+            self.assertEqual(self._session._get_task_sandbox(task, None),
+                             'ssh://host.xyz/tmp/abs')
+            gps.assert_not_called()
+
+        # cached pilot sandboxes are not changed by task sandboxes
+        pilot = {'uid'        : 'pilot.0001',
+                 'description': {'resource': 'local.localhost'}}
+        pilot_sandbox = str(self._session._get_pilot_sandbox(pilot))
+        self.assertTrue(pilot_sandbox.endswith('/pilot.0001/'))
+
+        task = {'uid': 'task.0003', 'description': {}}
+        self._session._get_task_sandbox(task, pilot)
+        self.assertEqual(str(self._session._get_pilot_sandbox(pilot)),
+                         pilot_sandbox)
+        self.assertTrue(task['task_sandbox'].startswith(pilot_sandbox))
+
+    # --------------------------------------------------------------------------
+    #
+    def test_get_jsurl(self):
+
+        pilot = {'description': {'resource'     : 'local.localhost',
+                                 'access_schema': 'local'}}
+
+        self._session._cache['js_urls'] = {}
+        js_url, js_hop = self._session._get_jsurl(pilot)
+        self.assertEqual(js_hop.schema, 'fork')
+
+        # second call is served from the cache, but returns fresh copies
+        with mock.patch.object(self._session, 'get_resource_config') as grc:
+            js_url_2, js_hop_2 = self._session._get_jsurl(pilot)
+            grc.assert_not_called()
+
+        self.assertEqual(str(js_url_2), str(js_url))
+        self.assertIsNot(js_url_2, js_url)
+
+        js_hop_2.schema = 'ssh'
+        _, js_hop_3 = self._session._get_jsurl(pilot)
+        self.assertEqual(js_hop_3.schema, 'fork')
+        self._session._cache['js_urls'] = {}
+
+        for js_ep, hop_schema in [('slurm+gsissh://host.xyz/', 'gsissh'),
+                                  ('ssh+pbs://host.xyz/',      'ssh'),
+                                  ('slurm://host.xyz/',        'fork'),
+                                  ('ssh://host.xyz/',          'fork')]:
+            rcfg = {'job_manager_endpoint': js_ep}
+            with mock.patch.object(self._session, 'get_resource_config',
+                                   return_value=rcfg):
+                _, js_hop = self._session._get_jsurl_from_rcfg('x.y', 'z')
+            self.assertEqual(js_hop.schema, hop_schema)
+
+    # --------------------------------------------------------------------------
+    #
+    @mock.patch.object(Session, '__init__', return_value=None)
+    @mock.patch.object(Session, '_init_cfg_from_scratch')
+    @mock.patch.object(Session, '_start_registry')
+    @mock.patch.object(Session, '_connect_registry')
+    @mock.patch.object(Session, '_start_proxy')
+    @mock.patch.object(Session, '_start_heartbeat')
+    @mock.patch.object(Session, '_publish_cfg')
+    @mock.patch.object(Session, '_start_components')
+    @mock.patch.object(Session, '_crosswire_proxy')
+    @mock.patch('time.sleep')
+    @mock.patch('radical.utils.zmq.Publisher')
+    def test_init_primary(self, mocked_pub, mocked_sleep, mocked_crosswire,
+                          mocked_components, mocked_publish_cfg,
+                          mocked_start_hb, mocked_start_proxy, *args):
+
+        s = Session()
+        s._role = Session._PRIMARY
+        s._uid  = 'rp.session.primary_test'
+        s._log  = mock.Mock()
+        s._prof = mock.Mock()
+        s._reg  = {'bridges.control_pubsub': {'addr_pub': 'tcp://localhost:1'}}
+
+        s._init_primary()
+        mocked_start_proxy.assert_called_once()
+        mocked_start_hb.assert_called_once()
+        mocked_publish_cfg.assert_called_once()
+        mocked_components.assert_called_once()
+        mocked_crosswire.assert_called_once()
+
+        # proxy errors are not lost, and the config is not published
+        mocked_publish_cfg.reset_mock()
+        mocked_start_proxy.side_effect = RuntimeError('proxy failed')
+        with self.assertRaises(RuntimeError):
+            s._init_primary()
+        mocked_publish_cfg.assert_not_called()
+
+    # --------------------------------------------------------------------------
+    #
+    @mock.patch.object(Session, '__init__', return_value=None)
+    @mock.patch('time.sleep')
+    @mock.patch('radical.utils.Heartbeat')
+    @mock.patch('radical.utils.zmq.Subscriber')
+    @mock.patch('radical.utils.zmq.Publisher')
+    @mock.patch('radical.utils.zmq.PubSub')
+    @mock.patch('radical.utils.zmq.Client')
+    def test_start_proxy(self, mocked_client, mocked_pubsub, mocked_pub,
+                         mocked_sub, mocked_hb, *args):
+
+        s = Session()
+        s._role        = Session._PRIMARY
+        s._uid         = 'rp.session.proxy_test'
+        s._log         = mock.Mock()
+        s._prof        = mock.Mock()
+        s._rep         = mock.Mock()
+        s._proxy       = None
+        s._proxy_url   = None
+        s._proxy_lock  = mt.Lock()
+        s._cfg         = ru.Config(from_dict={'path'     : '/tmp',
+                                              'heartbeat': {'timeout' : 10,
+                                                            'interval': 1}})
+
+        # obtain the actual heartbeat callback
+        s._start_heartbeat()
+        beat_cb = mocked_hb.call_args.kwargs['beat_cb']
+
+        requests    = list()
+        threads     = list()
+        in_register = list()  # requests seen while registration is pending
+
+        def _request(cmd, arg):
+            requests.append(cmd)
+            if cmd == 'register':
+                # a heartbeat fired during registration must not use the
+                # proxy client before registration completed
+                beat = mt.Thread(target=beat_cb)
+                beat.start()
+                beat.join(timeout=0.2)
+                threads.append(beat)
+                in_register.extend(requests)
+                return {'control_pubsub': {}}
+
+        mocked_client.return_value.request.side_effect = _request
+
+        with mock.patch.dict(os.environ,
+                             {'RADICAL_PILOT_PROXY_URL': 'tcp://localhost:1'}):
+            s._start_proxy()
+
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(in_register, ['register'])
+        self.assertEqual(requests,    ['register', 'heartbeat'])
+        self.assertIs(s._proxy, mocked_client.return_value)
+        self.assertEqual(s._proxy_cfg, {'control_pubsub': {}})
+        self.assertFalse(s._proxy_lock.locked())
+
+    # --------------------------------------------------------------------------
+    #
+    @mock.patch.object(Session, '__init__', return_value=None)
+    @mock.patch.object(Session, '_init_cfg_from_dict')
+    @mock.patch.object(Session, '_start_registry')
+    @mock.patch.object(Session, '_connect_registry')
+    @mock.patch.object(Session, '_connect_proxy')
+    @mock.patch.object(Session, '_start_heartbeat')
+    @mock.patch.object(Session, '_publish_cfg')
+    @mock.patch.object(Session, '_init_rm')
+    @mock.patch.object(Session, '_start_components')
+    @mock.patch.object(Session, '_crosswire_proxy')
+    def test_init_agent_0(self, mocked_crosswire, mocked_components,
+                          mocked_init_rm, *args):
+
+        s = Session()
+        s._role = Session._AGENT_0
+
+        s._init_agent_0()
+        mocked_init_rm.assert_called_once()
+        mocked_components.assert_called_once()
+        mocked_crosswire.assert_called_once()
+
+        # errors in the concurrently created resource manager are not lost
+        mocked_init_rm.side_effect = RuntimeError('rm failed')
+        with self.assertRaises(RuntimeError):
+            s._init_agent_0()
+
+    # --------------------------------------------------------------------------
+    #
+    @mock.patch.object(Session, '__init__', return_value=None)
+    @mock.patch('radical.pilot.utils.ComponentManager')
+    def test_start_components(self, mocked_cmgr, mocked_init):
+
+        s = Session()
+        s._uid  = 'rp.session.components_test'
+        s._role = Session._AGENT_N
+        s._log  = mock.Mock()
+        s._cmgr = None
+        s._cfg  = ru.Config(cfg={'reg_addr'  : 'tcp://localhost:1',
+                                 'bridges'   : {},
+                                 'components': {}})
+
+        # no component manager without bridges or components
+        s._start_components()
+        mocked_cmgr.assert_not_called()
+        self.assertIsNone(s._cmgr)
+
+        s._cfg.components = {'agent_executing': {'count': 1}}
+        s._start_components()
+        mocked_cmgr.assert_called_once()
+        s._cmgr.start_bridges.assert_called_once_with(s._cfg.bridges)
+        s._cmgr.start_components.assert_called_once_with(s._cfg.components)
+
     # --------------------------------------------------------------------------
     #
     @mock.patch.object(Session, '_get_reporter')
@@ -214,7 +546,16 @@ if __name__ == '__main__':
     tc.setUpClass()
     tc.test_list_resources()
     tc.test_get_resource_config()
+    tc.test_as_dict()
+    tc.test_get_managers()
     tc.test_get_resource_sandbox()
+    tc.test_sandbox_expand()
+    tc.test_get_task_sandbox()
+    tc.test_get_jsurl()
+    tc.test_init_primary()
+    tc.test_start_proxy()
+    tc.test_init_agent_0()
+    tc.test_start_components()
 
 # ------------------------------------------------------------------------------
 
@@ -11,6 +11,7 @@ import radical.utils as ru
 
 from radical.pilot.staging_directives   import expand_staging_directives
 from radical.pilot.utils.staging_helper import StagingHelper
+from radical.pilot.utils.staging_helper import StagingHelper_SAGA
 
 from unittest import mock, TestCase
 
@@ -65,6 +66,22 @@ class StagerTestCase(TestCase):
         with ru.ru_open(tgt_file) as fd:
             self.assertEqual(fd.readlines()[0], src_file_content)
 
+    # --------------------------------------------------------------------------
+    #
+    @mock.patch.object(StagingHelper_SAGA, '_has_saga', True)
+    @mock.patch.object(StagingHelper_SAGA, '_rsfs', create=True)
+    def test_saga_fs_dirs(self, mocked_rsfs):
+
+        helper = StagingHelper_SAGA(log=mock.Mock())
+
+        d1 = helper._get_fs_dir('ssh://host.xyz/a/b/')
+        d2 = helper._get_fs_dir('SSH://Host.XYZ/c/d')
+        self.assertIs(d1, d2)
+        mocked_rsfs.Directory.assert_called_once_with('ssh://host.xyz/')
+
+        helper._get_fs_dir('ssh://other.xyz/a/b/')
+        self.assertEqual(mocked_rsfs.Directory.call_count, 2)
+
 
 # ------------------------------------------------------------------------------
 
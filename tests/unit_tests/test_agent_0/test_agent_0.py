@@ -4,6 +4,7 @@ import glob
 import os
 import shutil
 import tempfile
+import time
 
 import threading as mt
 
@@ -268,6 +269,33 @@ class TestComponent(TestCase):
         self.assertTrue(agent_0._services_setup.is_set())
 
 
+    # --------------------------------------------------------------------------
+    #
+    @mock.patch.object(Agent_0, '__init__', return_value=None)
+    def test_ctrl_cancel_pilots(self, mocked_init):
+
+        agent_0 = Agent_0()
+        agent_0._pid         = 'pilot.0000'
+        agent_0._log         = mock.Mock()
+        agent_0._final_cause = None
+        agent_0.publish      = mock.Mock()
+        agent_0.stop         = mock.Mock()
+
+        # cancel requests for other pilots are ignored
+        msg = {'cmd': 'cancel_pilots',
+               'arg': {'uids': ['pilot.0001']}}
+        self.assertTrue(agent_0._ctrl_cancel_pilots(msg))
+        agent_0.publish.assert_not_called()
+        agent_0.stop.assert_not_called()
+        self.assertIsNone(agent_0._final_cause)
+
+        msg['arg']['uids'].append('pilot.0000')
+        self.assertFalse(agent_0._ctrl_cancel_pilots(msg))
+        agent_0.publish.assert_called_once()
+        agent_0.stop.assert_called_once()
+        self.assertEqual(agent_0._final_cause, 'cancel')
+
+
     # --------------------------------------------------------------------------
     #
     @mock.patch.object(Agent_0, '__init__', return_value=None)
@@ -301,6 +329,101 @@ class TestComponent(TestCase):
         reg.stop()
         reg.wait()
 
+    # --------------------------------------------------------------------------
+    #
+    @mock.patch.object(Agent_0, '__init__', return_value=None)
+    def test_check_lifetime(self, mocked_init):
+
+        agent_0 = Agent_0()
+        agent_0._log         = mock.Mock()
+        agent_0._final_cause = None
+        agent_0.stop         = mock.Mock()
+
+        agent_0._starttime = time.time()
+        agent_0._deadline  = agent_0._starttime + 60
+        self.assertTrue(agent_0._check_lifetime())
+        agent_0.stop.assert_not_called()
+
+        agent_0._deadline = agent_0._starttime - 1
+        self.assertFalse(agent_0._check_lifetime())
+        agent_0.stop.assert_called_once()
+        self.assertEqual(agent_0._final_cause, 'timeout')
+
+
+    # --------------------------------------------------------------------------
+    #
+    @mock.patch.object(Agent_0, '__init__', return_value=None)
+    def test_read_file(self, mocked_init):
+
+        fd, fname = tempfile.mkstemp()
+        self._cleanup_files.append(fname)
+
+        with os.fdopen(fd, 'w') as fout:
+            fout.write('head\n' + 'x' * 2048 + '\ntail\n')
+
+        agent_0 = Agent_0()
+
+        # only the end of the file is returned
+        data = agent_0._read_file(fname)
+        self.assertEqual(len(data), 1024)
+        self.assertTrue(data.endswith('x\ntail\n'))
+        self.assertNotIn('head', data)
+
+        self.assertEqual(agent_0._read_file(fname, size=5), 'tail\n')
+
+        # missing files result in an empty string
+        self.assertEqual(agent_0._read_file('%s.missing' % fname), '')
+
+
+    # --------------------------------------------------------------------------
+    #
+    @mock.patch.object(Agent_0, '__init__', return_value=None)
+    def test_proxy_input_cb(self, mocked_init):
+
+        advanced = list()
+
+        def _advance_effect(things, *args, **kwargs):
+            advanced.extend(things)
+
+        agent_0 = Agent_0()
+        agent_0._log      = mock.Mock()
+        agent_0._task_env = {'RP_TEST': 'test', 'RP_TEST_2': 'test_2'}
+        agent_0.advance   = mock.Mock(side_effect=_advance_effect)
+
+        tasks = [{'uid'        : 'task.0000',
+                  'state'      : rp.AGENT_STAGING_INPUT_PENDING,
+                  'description': {'environment': None}},
+                 {'uid'        : 'task.0001',
+                  'state'      : rp.AGENT_STAGING_INPUT_PENDING,
+                  'description': {'environment': {'RP_TEST': 'user',
+                                                  'USER_VAR': 'user'}}},
+                 {'uid'        : 'task.0002',
+                  'state'      : rp.AGENT_EXECUTING,
+                  'description': {}}]
+
+        agent_0._proxy_input_cb(tasks)
+
+        # task in invalid state is not advanced
+        self.assertEqual([t['uid'] for t in advanced],
+                         ['task.0000', 'task.0001'])
+
+        self.assertEqual(advanced[0]['description']['environment'],
+                         {'RP_TEST': 'test', 'RP_TEST_2': 'test_2'})
+        self.assertEqual(advanced[1]['description']['environment'],
+                         {'RP_TEST': 'test', 'RP_TEST_2': 'test_2',
+                          'USER_VAR': 'user'})
+
+        # no task environment configured
+        advanced.clear()
+        agent_0._task_env = None
+        tasks = [{'uid'        : 'task.0003',
+                  'state'      : rp.AGENT_STAGING_INPUT_PENDING,
+                  'description': {'environment': {'USER_VAR': 'user'}}}]
+
+        agent_0._proxy_input_cb(tasks)
+        self.assertEqual(advanced[0]['description']['environment'],
+                         {'USER_VAR': 'user'})
+
 
 # ------------------------------------------------------------------------------
 #
@@ -311,6 +434,10 @@ if __name__ == '__main__':
     tc.test_start_sub_agents()
     tc.test_start_services()
     tc.test_ctrl_service_up()
+    tc.test_ctrl_cancel_pilots()
+    tc.test_check_lifetime()
+    tc.test_read_file()
+    tc.test_proxy_input_cb()
 
 
 # ------------------------------------------------------------------------------
@@ -2,8 +2,14 @@
 
 import glob
 import os
+import shutil
+import tarfile
+import tempfile
+
+import concurrent.futures as cf
 
 import radical.utils as ru
+import radical.pilot as rp
 
 from unittest import TestCase, mock
 
@@ -54,6 +60,8 @@ class StageInTC(TestCase):
                                        side_effect=_handle_task_side_effect)
         component.advance = mock.MagicMock(side_effect=_advance_side_effect)
         component._log = ru.Logger('dummy')
+        component._pool = cf.ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(component._pool.shutdown)
 
         for test in self._test_cases:
             global_things = []
@@ -62,11 +70,158 @@ class StageInTC(TestCase):
             self.assertEqual(global_things, test[1][0])
             self.assertEqual(global_state, test[1][1])
 
+    # --------------------------------------------------------------------------
+    #
+    @mock.patch.object(Default, '__init__', return_value=None)
+    def test_work_staging_error(self, mocked_init):
+
+        component = Default(cfg=None, session=None)
+        component._handle_task = mock.Mock(side_effect=OSError('no space'))
+        component.advance      = mock.Mock()
+        component._log         = mock.Mock()
+        component._pool        = cf.ThreadPoolExecutor(max_workers=2)
+        self.addCleanup(component._pool.shutdown)
+
+        tasks = [{'uid'        : 'task.%06d' % idx,
+                  'description': {'input_staging': [{'action': rp.COPY}]}}
+                 for idx in range(2)]
+        component._work(tasks)
+
+        # failed tasks are advanced individually by the component thread
+        self.assertEqual(component.advance.call_count, 2)
+        for task in tasks:
+            self.assertEqual(task['target_state'], rp.FAILED)
+            self.assertIn('no space', task['exception'])
+            component.advance.assert_any_call(
+                task, rp.TMGR_STAGING_OUTPUT_PENDING, publish=True, push=True)
+
+    # --------------------------------------------------------------------------
+    #
+    @mock.patch.object(Default, '__init__', return_value=None)
+    def test_handle_task(self, mocked_init):
+
+        pilot_sbox = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, pilot_sbox)
+
+        with ru.ru_open('%s/input.dat' % pilot_sbox, 'w') as fout:
+            fout.write('data\n')
+
+        out_dir = '%s/out' % pilot_sbox
+        os.mkdir(out_dir)
+
+        in_dir = '%s/in' % pilot_sbox
+        os.mkdir(in_dir)
+        with ru.ru_open('%s/in.dat' % in_dir, 'w') as fout:
+            fout.write('dir data\n')
+
+        component = Default(cfg=None, session=None)
+        component._log      = mock.Mock()
+        component._prof     = mock.Mock()
+        component._contexts = dict()
+
+        for idx in range(2):
+
+            uid       = 'task.%06d' % idx
+            task_sbox = '%s/%s' % (pilot_sbox, uid)
+            task      = {'uid'             : uid,
+                         'task_sandbox'    : 'file://localhost%s/' % task_sbox,
+                         'pilot_sandbox'   : 'file://localhost%s/' % pilot_sbox,
+                         'session_sandbox' : 'file://localhost/tmp/',
+                         'resource_sandbox': 'file://localhost/tmp/',
+                         'endpoint_fs'     : 'file://localhost/',
+                         'description'     : {}}
+            actionables = [{'uid'   : 'sd.0000',
+                            'action': rp.COPY,
+                            'source': 'pilot:///input.dat',
+                            'target': 'task:///copy.dat'},
+                           {'uid'   : 'sd.0001',
+                            'action': rp.LINK,
+                            'source': 'pilot:///input.dat',
+                            'target': 'task:///link.dat'},
+                           {'uid'   : 'sd.0002',
+                            'action': rp.COPY,
+                            'source': 'pilot:///input.dat',
+                            'target': out_dir},
+                           {'uid'   : 'sd.0003',
+                            'action': rp.COPY,
+                            'source': 'pilot:///in',
+                            'target': 'task:///in_copy'}]
+
+            with mock.patch('os.makedirs', wraps=os.makedirs) as mocked_mkdir:
+                component._handle_task(task, actionables)
+
+            # each target directory is created only once (`copytree` creates
+            # the directories it copies on its own)
+            made = [c[0][0] for c in mocked_mkdir.call_args_list]
+            self.assertEqual(made.count(task_sbox), 1)
+            self.assertEqual(made.count(out_dir),   1)
+
+            with ru.ru_open('%s/copy.dat' % task_sbox) as fin:
+                self.assertEqual(fin.read(), 'data\n')
+            self.assertEqual(os.readlink('%s/link.dat' % task_sbox),
+                             '%s/input.dat' % pilot_sbox)
+
+            # existing target directories receive the source file
+            self.assertTrue(os.path.isfile('%s/input.dat' % out_dir))
+
+            # directories are copied recursively
+            with ru.ru_open('%s/in_copy/in.dat' % task_sbox) as fin:
+                self.assertEqual(fin.read(), 'dir data\n')
+
+        # all tasks share the same pilot level sandboxes
+        self.assertEqual(len(component._contexts), 1)
+
+
+    # --------------------------------------------------------------------------
+    #
+    @mock.patch.object(Default, '__init__', return_value=None)
+    def test_handle_task_tarball(self, mocked_init):
+
+        pilot_sbox = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, pilot_sbox)
+
+        uid       = 'task.000000'
+        task_sbox = '%s/%s' % (pilot_sbox, uid)
+        os.mkdir(task_sbox)
+
+        # the tmgr stager packs files with their absolute target paths
+        src_file = '%s/input.dat' % pilot_sbox
+        with ru.ru_open(src_file, 'w') as fout:
+            fout.write('data\n')
+        with tarfile.open('%s/%s.tar' % (task_sbox, uid), mode='w') as tar:
+            tar.add(src_file, arcname='%s/staged.dat' % task_sbox)
+
+        component = Default(cfg=None, session=None)
+        component._log      = mock.Mock()
+        component._prof     = mock.Mock()
+        component._contexts = dict()
+
+        task = {'uid'             : uid,
+                'task_sandbox'    : 'file://localhost%s/' % task_sbox,
+                'pilot_sandbox'   : 'file://localhost%s/' % pilot_sbox,
+                'session_sandbox' : 'file://localhost/tmp/',
+                'resource_sandbox': 'file://localhost/tmp/',
+                'endpoint_fs'     : 'file://localhost/',
+                'description'     : {}}
+        actionables = [{'uid'   : 'sd.0000',
+                        'action': rp.TARBALL,
+                        'source': 'file://localhost/tmp/rp_usi.tar',
+                        'target': 'task:///%s.tar' % uid}]
+
+        component._handle_task(task, actionables)
+
+        with ru.ru_open('%s/staged.dat' % task_sbox) as fin:
+            self.assertEqual(fin.read(), 'data\n')
+
+
 
 if __name__ == '__main__':
 
     tc = StageInTC()
     tc.test_work()
+    tc.test_work_staging_error()
+    tc.test_handle_task()
+    tc.test_handle_task_tarball()
 
 
 # ------------------------------------------------------------------------------
@@ -39,12 +39,36 @@ class TestMPIExec(TestCase):
         self.assertFalse(lm_info['mpt'])
         self.assertFalse(lm_info['rsh'])
         self.assertTrue(lm_info['use_rf'])
+        self.assertFalse(lm_info['use_hf'])
         self.assertFalse(lm_info['ccmrun'])
         self.assertFalse(lm_info['dplace'])
         self.assertFalse(lm_info['omplace'])
         self.assertEqual(lm_info['mpi_version'], mocked_mpi_info()[0])
         self.assertEqual(lm_info['mpi_flavor'],  mocked_mpi_info()[1])
 
+        # the help text is fetched once for all option checks
+        mocked_sh_callout.assert_called_once()
+
+        mocked_sh_callout.reset_mock()
+        mocked_sh_callout.return_value = ['  -f <hostfile>  ...']
+        lm_info = lm_mpiexec._init_from_scratch(env, env_sh)
+        self.assertFalse(lm_info['use_rf'])
+        self.assertTrue(lm_info['use_hf'])
+        mocked_sh_callout.assert_called_once()
+
+    # --------------------------------------------------------------------------
+    #
+    def test_check_available_lm_options(self):
+
+        lm_help = '  -rf, --rankfile <file>  use rankfile\n' \
+                  '  -hostfile <file>        use hostfile\n'
+
+        self.assertTrue(MPIExec._check_available_lm_options(lm_help, '-rf'))
+        self.assertFalse(MPIExec._check_available_lm_options(lm_help, '-f'))
+        self.assertFalse(MPIExec._check_available_lm_options(lm_help, '-r'))
+        self.assertFalse(MPIExec._check_available_lm_options('', '-rf'))
+        self.assertFalse(MPIExec._check_available_lm_options(None, '-rf'))
+
     # --------------------------------------------------------------------------
     #
     @mock.patch.object(MPIExec, '__init__', return_value=None)
@@ -113,6 +137,7 @@ class TestMPIExec(TestCase):
         self.assertEqual(lm_mpiexec._omplace,     'omplace')
         self.assertEqual(lm_mpiexec._mpi_version, lm_info['mpi_version'])
         self.assertEqual(lm_mpiexec._mpi_flavor,  lm_info['mpi_flavor'])
+        self.assertIn('$MPT_MPI_RANK', lm_mpiexec.get_rank_cmd())
 
     # --------------------------------------------------------------------------
     #
@@ -242,6 +267,23 @@ class TestMPIExec(TestCase):
 
         os.unlink(rank_file)
 
+        self.assertEqual(dict(lm_mpiexec._get_host_slots(slots)),
+                         {'node_A': 4, 'node_B': 2})
+
+        # hosts are listed in order of their first use
+        lm_mpiexec._command = 'mpiexec'
+        lm_mpiexec._use_rf  = True
+        lm_mpiexec._omplace = ''
+
+        task = {'uid'              : uid,
+                'slots'            : slots,
+                'task_sandbox_path': sandbox}
+        self.assertEqual(lm_mpiexec.get_launch_cmds(task, 'exec.sh'),
+                         'mpiexec -np 6 -H node_A,node_B -rf %s exec.sh'
+                         % rank_file_expected)
+
+        os.unlink(rank_file)
+
     # --------------------------------------------------------------------------
     #
     @mock.patch.object(MPIExec, '__init__',   return_value=None)
@@ -313,25 +355,25 @@ class TestMPIExec(TestCase):
         lm_mpiexec._mpt = False
         lm_mpiexec._mpi_flavor = lm_mpiexec.MPI_FLAVOR_OMPI
 
-        command = lm_mpiexec.get_rank_cmd()
+        command = lm_mpiexec._build_rank_cmd()
         self.assertIn('$MPI_RANK',  command)
         self.assertIn('$PMIX_RANK', command)
 
         self.assertNotIn('$PMI_ID', command)
         lm_mpiexec._mpi_flavor = lm_mpiexec.MPI_FLAVOR_HYDRA
-        command = lm_mpiexec.get_rank_cmd()
+        command = lm_mpiexec._build_rank_cmd()
         self.assertIn('$PMI_ID',    command)
         self.assertIn('$PMI_RANK',  command)
 
         self.assertNotIn('$PALS_RANKID', command)
         lm_mpiexec._mpi_flavor = lm_mpiexec.MPI_FLAVOR_PALS
-        command = lm_mpiexec.get_rank_cmd()
+        command = lm_mpiexec._build_rank_cmd()
         self.assertIn('$PALS_RANKID', command)
 
         # special case - MPT
         self.assertNotIn('$MPT_MPI_RANK', command)
         lm_mpiexec._mpt = True
-        command = lm_mpiexec.get_rank_cmd()
+        command = lm_mpiexec._build_rank_cmd()
         self.assertIn('$MPT_MPI_RANK', command)
 
 # ------------------------------------------------------------------------------
@@ -342,6 +384,7 @@ if __name__ == '__main__':
     tc = TestMPIExec()
     tc.test_init_from_scratch()
     tc.test_init_from_scratch_with_name()
+    tc.test_check_available_lm_options()
     tc.test_init_from_info()
     tc.test_can_launch()
     tc.test_get_launcher_env()
@@ -1,8 +1,9 @@
 # pylint: disable=unused-argument, no-value-for-parameter
 
-from unittest import TestCase
+from unittest import TestCase, mock
 
-from radical.pilot import PythonTask
+from radical.pilot       import PythonTask
+from radical.pilot.utils import serialize_obj
 
 
 # ------------------------------------------------------------------------------
@@ -42,5 +43,25 @@ class TestPytask(TestCase):
 
         self.assertIsInstance(decor_task, str)
 
+    # --------------------------------------------------------------------------
+    #
+    def test_decor_serialize_once(self):
+
+        @PythonTask.pythontask
+        def hello_test(y):
+            return 2 * y
+
+        with mock.patch('radical.pilot.pytask.serialize_obj',
+                        wraps=serialize_obj) as mocked_serialize:
+            tasks = [hello_test(y) for y in range(3)]
+
+        # the function is serialized once, the arguments differ per task
+        mocked_serialize.assert_called_once()
+        for y, task in enumerate(tasks):
+            func, args, kwargs = PythonTask.get_func_attr(task)
+            self.assertEqual(args, [y])
+            self.assertEqual(kwargs, {})
+            self.assertEqual(func(*args), 2 * y)
+
 
 # ------------------------------------------------------------------------------
@@ -207,6 +207,73 @@ class RaptorMasterTC(TestCase):
         with self.assertRaises(RuntimeError):
             raptor_master.submit_workers([td])
 
+    # --------------------------------------------------------------------------
+    #
+    @mock.patch.object(Master, '__init__', return_value=None)
+    def test_submit_workers(self, mocked_init):
+
+        raptor_master = Master(cfg=None)
+        raptor_master._uid     = 'master.0000'
+        raptor_master._sbox    = '/tmp/master.0000'
+        raptor_master._psbox   = 'file://localhost/tmp/'
+        raptor_master._ssbox   = 'file://localhost/tmp/'
+        raptor_master._rsbox   = 'file://localhost/tmp/'
+        raptor_master._pid     = 'pilot.0000'
+        raptor_master._workers = dict()
+        raptor_master._reg     = mock.MagicMock()
+        raptor_master._log     = mock.Mock()
+        raptor_master.publish  = mock.Mock()
+        raptor_master.advance  = mock.Mock()
+
+        reg  = raptor_master._reg
+        tds  = [rp.TaskDescription({'mode' : rp.RAPTOR_WORKER,
+                                    'ranks': 2}) for _ in range(2)]
+        uids = raptor_master.submit_workers(tds)
+
+        self.assertEqual(len(set(uids)), 2)
+        for uid in uids:
+            self.assertTrue(uid.startswith('master.0000.worker'))
+            self.assertIn(uid, raptor_master._workers)
+            self.assertEqual(len(raptor_master._workers[uid]['heartbeats']), 2)
+
+        tasks = raptor_master.advance.call_args[0][0]
+        self.assertEqual([t['uid'] for t in tasks], uids)
+
+        for task in tasks:
+            descr = task['description']
+            self.assertEqual(descr['raptor_id'],  'master.0000')
+            self.assertEqual(descr['executable'], 'radical-pilot-raptor-worker')
+            self.assertEqual(descr['arguments'],
+                             ['', 'DefaultWorker', 'master.0000'])
+
+            # the same description is published to the registry
+            reg.__setitem__.assert_any_call('raptor.%s.cfg' % task['uid'],
+                                            descr)
+
+        reg.dump.assert_called_once_with('master.0000')
+
+    # --------------------------------------------------------------------------
+    #
+    @mock.patch.object(Master, '__init__', return_value=None)
+    def test_join(self, mocked_init):
+
+        raptor_master = Master(cfg=None)
+        raptor_master._thread = None
+
+        # nothing to wait for
+        self.assertTrue(raptor_master.join(timeout=0.1))
+
+        event = mt.Event()
+        raptor_master._thread = mt.Thread(target=event.wait)
+        raptor_master._thread.daemon = True
+        raptor_master._thread.start()
+
+        # thread still running after timeout
+        self.assertFalse(raptor_master.join(timeout=0.1))
+
+        event.set()
+        self.assertTrue(raptor_master.join(timeout=5))
+
 
 # ------------------------------------------------------------------------------
 
@@ -215,5 +282,7 @@ if __name__ == '__main__':
     tc = RaptorMasterTC()
     tc.test_wait()
     tc.test_submit_workers_err()
+    tc.test_submit_workers()
+    tc.test_join()
 
 # ------------------------------------------------------------------------------
@@ -5,6 +5,10 @@
 __copyright__ = 'Copyright 2013-2022, The RADICAL-Cybertools Team'
 __license__   = 'MIT'
 
+import os
+import copy
+import tempfile
+
 import threading as mt
 
 from unittest import TestCase
@@ -13,6 +17,8 @@ from unittest import mock
 import radical.utils           as ru
 import radical.pilot.constants as rpc
 
+import radical.pilot.task_manager as rptm
+
 from radical.pilot.task_manager import TaskManager
 
 
@@ -117,6 +123,56 @@ class TMGRTestCase(TestCase):
         # no callbacks for earlier set metric
         self.assertFalse(component._callbacks[rpc.TASK_STATE]['*'])
 
+    # --------------------------------------------------------------------------
+    #
+    @mock.patch.object(TaskManager, '__init__', return_value=None)
+    def test_dump_json(self, mocked_init):
+
+        component = TaskManager(None)
+        component._log = mock.Mock()
+
+        data = {'uid'  : 'tmgr.0000',
+                'tasks': {'task.0000': {'uid'  : 'task.0000',
+                                        'state': 'DONE',
+                                        'slots': {1: ['node_0']}}}}
+        # stdlib semantics: non-string keys are converted to strings
+        expected = {'uid'  : 'tmgr.0000',
+                    'tasks': {'task.0000': {'uid'  : 'task.0000',
+                                            'state': 'DONE',
+                                            'slots': {'1': ['node_0']}}}}
+
+        tgt = os.path.join(tempfile.mkdtemp(), 'tmgr.0000.json')
+
+        # with and without the optional `orjson` module
+        for mod in [rptm.orjson, None]:
+            with mock.patch.object(rptm, 'orjson', mod):
+                component._dump_json(data, tgt)
+                self.assertEqual(ru.read_json(tgt), expected)
+                os.unlink(tgt)
+
+        # typed dicts (like the tmgr config) are dumped with their content
+        cfg  = ru.Config('radical.pilot.session', name='default')
+        data['cfg'] = copy.deepcopy(cfg)
+        expected['cfg'] = cfg.as_dict()
+        self.assertTrue(expected['cfg'])
+        for mod in [rptm.orjson, None]:
+            with mock.patch.object(rptm, 'orjson', mod):
+                component._dump_json(data, tgt)
+                self.assertEqual(ru.read_json(tgt), expected)
+                os.unlink(tgt)
+        component._log.warn.assert_not_called()
+
+        # fall back to stdlib encoding if `orjson` rejects the data
+        if rptm.orjson:
+            data['tasks']['task.0000']['exit_code'] = 2 ** 70
+            component._dump_json(data, tgt)
+            self.assertEqual(ru.read_json(tgt)['tasks']['task.0000']
+                                              ['exit_code'], 2 ** 70)
+            component._log.warn.assert_called_once()
+
+        os.unlink(tgt)
+        os.rmdir(os.path.dirname(tgt))
+
 
 # ------------------------------------------------------------------------------
 
@@ -124,5 +180,6 @@ if __name__ == '__main__':
 
     tc = TMGRTestCase()
     tc.test_add_pilots()
+    tc.test_dump_json()
 
 
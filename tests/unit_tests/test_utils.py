@@ -151,6 +151,32 @@ class TestUtils(TestCase):
         # set dirs and files for cleanup
         self._cleanup_files.extend([sid, cache])
 
+    # --------------------------------------------------------------------------
+    #
+    def test_get_session_description(self):
+
+        sid = 'rp.session.test_rputils.0002'
+        src = os.path.abspath(sid)
+        ru.rec_makedir(src)
+        self._cleanup_files.append(src)
+
+        ru.write_json({'cfg': {}, 'rcfgs': {}}, '%s/%s.reg.json' % (src, sid))
+        for idx in range(3):
+            ru.write_json({'uid': 'tmgr.%04d' % idx, 'tasks': {}},
+                          '%s/tmgr.%04d.json' % (src, idx))
+        ru.write_json({'uid': 'pmgr.0000', 'pilots': []},
+                      '%s/pmgr.0000.json' % src)
+
+        # not manager dumps
+        ru.write_json({}, '%s/tmgr.json' % src)
+        ru.write_json({}, '%s/tmgr.0000.prof.json.bak' % src)
+
+        descr = rpu_prof.get_session_description(sid, src)
+        tree  = descr['tree']
+        self.assertEqual(tree[sid]['children'],
+                         ['pmgr.0000', 'tmgr.0000', 'tmgr.0001', 'tmgr.0002'])
+        self.assertEqual(tree['tmgr.0001']['etype'], 'tmgr')
+
     # --------------------------------------------------------------------------
     #
     def test_get_session_profile(self):
@@ -181,6 +207,12 @@ class TestUtils(TestCase):
         self.assertEqual(rcfgs, rpu_misc._rcfgs)
         self.assertIsInstance(rcfgs.as_dict(), dict)
 
+        # callers get independent copies of the cached configs
+        rcfgs_2 = rpu_misc.get_resource_configs()
+        rcfgs_2.local.localhost.launch_methods.order.append('UNKNOWN')
+        self.assertNotIn('UNKNOWN',
+                         rpu_misc._rcfgs.local.localhost.launch_methods.order)
+
         # test a single resource config
 
         rcfg_none = rpu_misc.get_resource_config('unknown_site.resource')
@@ -230,6 +262,7 @@ if __name__ == '__main__':
     tc.test_convert_sdurations()
     tc.test_expand_sduration()
     tc.test_get_session_json()
+    tc.test_get_session_description()
     tc.test_get_session_profile()
     tc.test_resource_cfg()
 